@@ -1,25 +1,49 @@
+import os
+
+# SERVER_MODE=async serves every app on gevent: the monkey patch has to run before the
+# apps (and the OpenAI client's sockets) are imported, so it lives at the very top.
+ASYNC_MODE = os.getenv("SERVER_MODE", "").lower() == "async"
+if ASYNC_MODE:
+    from gevent import monkey
+    monkey.patch_all()
+
 from Initialize_db import initialize_session_data
+from conversationStore import open_conversation_store, DEFAULT_SESSION
 import multiprocessing
-from Server2 import app as lion_app
-from Server3 import app as owl_app
-from Server4 import app as tusk_app
+from mascotServer import app as mascot_app, speech_pool
+from Server4 import app as match_app
 from Server5 import app as summary_app
 from authServer import app as auth_app
 
-def run_lion_server():
-    lion_app.run(debug=True, port=5000, use_reloader=False)
+# Max in-flight requests per server in async mode; each one is a greenlet, not a thread
+ASYNC_CONCURRENCY = int(os.getenv("SERVER_CONCURRENCY", 1000))
+
+def serve(app, port):
+    """
+    Serve an app with the Flask dev server, or in async mode with gevent's WSGI server.
+    In async mode every blocking socket call (the OpenAI client, speech recognition)
+    yields to other requests, so one process multiplexes many in-flight LLM waits.
+    """
+    if ASYNC_MODE:
+        from gevent.pool import Pool
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(("0.0.0.0", port), app, spawn=Pool(ASYNC_CONCURRENCY)).serve_forever()
+    else:
+        app.run(debug=True, port=port, use_reloader=False)
 
-def run_owl_server():
-    owl_app.run(debug=True, port=5001, use_reloader=False)
+def run_mascot_server():
+    # Fork and warm the speech workers before the first upload arrives
+    speech_pool.start()
+    serve(mascot_app, 5000)
 
-def run_tusk_server():
-    tusk_app.run(debug=True, port=5002, use_reloader=False)
+def run_match_server():
+    serve(match_app, 5002)
 
 def run_auth_server():
-    auth_app.run(debug=True,port=5003,use_reloader=False)
+    serve(auth_app, 5003)
 
 def run_summary_server():
-    summary_app.run(debug=True, port=5004, use_reloader=False)
+    serve(summary_app, 5004)
 
 def main():
     multiprocessing.freeze_support()
@@ -27,48 +51,45 @@ def main():
     # Step 1: Initialize session data
     db_path = initialize_session_data()
     print(f"Session data initialized at: {db_path}")
+
+    # Clients that send no session id share the default session; start it fresh like the old in-process counters
+    open_conversation_store().reset(DEFAULT_SESSION)
     
     # Step 2: Create processes for each server
-    lion_process = multiprocessing.Process(target=run_lion_server)
-    owl_process = multiprocessing.Process(target=run_owl_server)
-    tusk_process = multiprocessing.Process(target=run_tusk_server)
+    # Lion, Owl and Tusk share one mascot server; personas come from backend/data/mascot_moods.json
+    mascot_process = multiprocessing.Process(target=run_mascot_server)
+    match_process = multiprocessing.Process(target=run_match_server)
     summary_process = multiprocessing.Process(target=run_summary_server)
     auth_process= multiprocessing.Process(target=run_auth_server)
     
     try:
         # Start all servers
-        print("Starting Lion server on port 5000...")
-        lion_process.start()
-        
-        print("Starting Owl server on port 5001...")
-        owl_process.start()
+        print("Starting mascot server on port 5000...")
+        mascot_process.start()
         
-        print("Starting Tusk server on port 5002...")
-        tusk_process.start()
+        print("Starting match server on port 5002...")
+        match_process.start()
 
         print("Starting auth server on port 5003...")
         auth_process.start()
 
-        print("Starting auth server on port 5004...")
+        print("Starting summary server on port 5004...")
         summary_process.start()
         
         # Wait for all servers
-        lion_process.join()
-        owl_process.join()
-        tusk_process.join()
+        mascot_process.join()
+        match_process.join()
         auth_process.join()
         summary_process.join()
 
     except KeyboardInterrupt:
         print("\nShutting down servers...")
-        lion_process.terminate()
-        owl_process.terminate()
-        tusk_process.terminate()
+        mascot_process.terminate()
+        match_process.terminate()
         auth_process.terminate()
         summary_process.terminate()
-        lion_process.join()
-        owl_process.join()
-        tusk_process.join()
+        mascot_process.join()
+        match_process.join()
         auth_process.join()
         summary_process.join()
         print("Servers shut down successfully")
@@ -1,13 +1,22 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import openai
 import os
 from dotenv import load_dotenv
-import speech_recognition as sr
-import base64
-import tempfile
-from pydub import AudioSegment
 import json
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timezone
+from personaRegistry import load_personas
+from conversationStore import open_conversation_store, session_id_from
+from completionCache import bypass_requested
+from llmClient import chat_completion, completion_cache
+from singleFlight import SingleFlight, idempotency_key_from
+from matchStore import open_match_store, SORT_COLUMNS, InvalidCursorError
+from matchResponse import InvalidMatchResponse, parse_match_response
+from matchPrefilter import tfidf_scores, preference_text, shortlist
+from jobQueue import JobQueue, JobQueueFull, async_requested, accepted, queue_full, register_job_routes
 
 # Load environment variables
 load_dotenv(dotenv_path=os.path.join("instance", ".env"))
@@ -21,270 +30,221 @@ CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "OPTIONS
 
 # Directories
 BASE_DIR = "backend"
-BUSINESS_PITCH_DIR = os.path.join(BASE_DIR, "BusinessPitch")
-MASCOTS_DIR = {
-    "tusk": os.path.join(BASE_DIR, "Tusk"),
-}
+INVESTOR_INFO_DIR = os.path.join(BASE_DIR, "investorInfo")
+INVESTOR_PREFERENCES_PATH = os.path.join(INVESTOR_INFO_DIR, "investor_preferences.json")
 
 # Ensure directories exist
-os.makedirs(BUSINESS_PITCH_DIR, exist_ok=True)
-for mascot_dir in MASCOTS_DIR.values():
-    os.makedirs(mascot_dir, exist_ok=True)
+os.makedirs(INVESTOR_INFO_DIR, exist_ok=True)
 
-# Track conversation stages
-counters = {mascot: 0 for mascot in MASCOTS_DIR.keys()}
+# Pitches and mascot conversations are read from the store the mascot server writes to
+PERSONAS = load_personas()
+store = open_conversation_store()
 
-@app.route('/conversation', methods=['POST'])
-def conversation():
+# Matches live in an indexed SQLite store; matches_db.json is imported into it once
+matches = open_match_store()
+
+# Model used to score matches; with MATCH_STRUCTURED_OUTPUT=1 it is asked for JSON mode when it supports it
+MATCH_MODEL = os.getenv("MATCH_MODEL", "gpt-4")
+MATCH_STRUCTURED_OUTPUT = os.getenv("MATCH_STRUCTURED_OUTPUT", "1") == "1"
+
+# Duplicate /processMatch calls share one completion
+match_flights = SingleFlight(results_ttl=int(os.getenv("IDEMPOTENCY_TTL", 300)))
+
+# "async": true runs /processMatch as a background job that clients poll at /jobs/<id>
+jobs = JobQueue(
+    workers=int(os.getenv("JOB_WORKERS", 8)),
+    max_queue=int(os.getenv("JOB_MAX_QUEUE", 64)),
+    results_ttl=int(os.getenv("JOB_TTL", 3600)),
+)
+register_job_routes(app, jobs)
+
+@app.route("/SaveInvestorPreferences", methods=["POST"])
+def save_investor_preferences():
     """
-    Handles conversation logic for Mr. Tusk.
+    Endpoint to save investor preferences in a JSON file.
     """
     try:
-        data = request.get_json()
-        mascot = data.get("mascot", "tusk").lower()
-        input_text = data.get("input", "").strip()
-
-        if mascot not in MASCOTS_DIR:
-            return jsonify({"error": f"Invalid mascot '{mascot}' specified."}), 400
-
-        # Ensure BusinessPitch.txt exists
-        business_pitch_path = os.path.join(BUSINESS_PITCH_DIR, "BusinessPitch.txt")
-        if not os.path.exists(business_pitch_path):
-            return jsonify({"error": "Business pitch not found. Please start from the initial pitch page."}), 400
-
-        # Read the business pitch for context
-        with open(business_pitch_path, "r") as f:
-            business_pitch = f.read()
-
-        # Handle static initial response
-        if counters[mascot] == 0 and not input_text:
-            return jsonify({
-                "message": "Let's talk numbers. Show me how this venture makes money.",
-                "mood": "Neutral",
-                "turn": 0,
-                "isComplete": False
-            })
-
-        # Save user input for non-initial responses
-        if counters[mascot] > 0:
-            user_file = os.path.join(MASCOTS_DIR[mascot], f"User{counters[mascot]}.txt")
-            with open(user_file, "w") as f:
-                f.write(input_text)
-
-        # Build conversation prompt
-        current_response_number = counters[mascot] + 1
-        prompt = build_conversation_history(MASCOTS_DIR[mascot], mascot, current_response_number, business_pitch)
-        mascot_file = os.path.join(MASCOTS_DIR[mascot], f"{mascot.capitalize()}{current_response_number}.txt")
-
-        # Generate response
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a venture capitalist assistant."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=150,
-            temperature=0.7
-        )
-
-        gpt_response = response["choices"][0]["message"]["content"].strip()
-        allowed_emotions = ["Neutral", "Angry", "Surprised", "Happy", "Cool"]
-        if "---" in gpt_response:
-            message, emotion = gpt_response.rsplit("---", 1)
-            emotion = emotion.strip() if emotion.strip() in allowed_emotions else "Neutral"
-        else:
-            message = gpt_response
-            emotion = "Neutral"
-
-        final_response = f"{message.strip()} --- {emotion}"
-        with open(mascot_file, "w") as f:
-            f.write(final_response)
+        # Get the JSON data from the request
+        preferences_data = request.get_json()
+        if not preferences_data:
+            return jsonify({"error": "No data provided"}), 400
+        
+        # Create a unique filename (e.g., timestamp-based or static for simplicity)
+        file_name = "investor_preferences.json"
+        file_path = os.path.join(BASE_DIR,"investorInfo", file_name)
 
-        counters[mascot] += 1
-        is_complete = counters[mascot] >= 3
+        # Save data to a JSON file
+        with open(file_path, "w") as file:
+            json.dump(preferences_data, file, indent=4)
 
-        return jsonify({
-            "message": message.strip(),
-            "mood": emotion,
-            "turn": counters[mascot],
-            "isComplete": is_complete
-        })
+        return jsonify({"message": "Investor preferences saved successfully!"}), 200
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return jsonify({"error": str(e)}), 500 
 
 
-def build_conversation_history(mascot_dir, mascot, current_counter, business_pitch):
-    """
-    Build a conversation prompt for the mascot using the pitch and past exchanges.
-    """
-    # Tusk’s personality prompt
-    prompt = (
-        "You are Mr. Tusk, a venture capitalist focused on financial analysis and market strategy. Keep responses relatively brief, and max 1 question per non-final turn. "
-        "You value detailed financial insights, profitability, and long-term market viability. "
-        "Your traits:\n"
-        "- Direct and strategic\n"
-        "- Interested in numbers, ROI, and market scalability\n"
-        "- Highly skeptical of vague financial projections\n"
-        "- Values thorough cost-benefit analysis and risk assessment\n\n"
-        "React based on financial soundness:\n"
-        "- Neutral: reasonable financial ideas\n"
-        "- Angry: vague or poorly thought-out projections\n"
-        "- Surprised: innovative financial strategies\n"
-        "- Happy: well-researched and profitable financial models\n"
-        "- Cool: highly profitable and scalable ideas with minimal risk, or interesting/unique approaches\n\n"
-        f"Current turn: {current_counter}/3. "
-        f"{'Provide a final financial assessment without further questions.' if current_counter == 3 else 'Focus on financial evaluation and ask specific questions.'}\n\n"
-        f"Business Pitch: {business_pitch}\n\n"
+def load_investor_preferences():
+    """The saved investor preferences, or None if none have been saved yet."""
+    if not os.path.exists(INVESTOR_PREFERENCES_PATH):
+        return None
+    with open(INVESTOR_PREFERENCES_PATH, "r") as f:
+        return json.load(f)
+
+
+def example_animal_feedback():
+    """The animalFeedback part of the example match: one review per registered mascot plus a summary."""
+    feedback = {
+        persona["feedbackKey"]: {
+            "score": 90,
+            "positives": [f"Strength a {persona['character'] or 'investor'} would value"],
+            "concerns": [f"Concern a {persona['character'] or 'investor'} would raise"],
+        }
+        for persona in PERSONAS.values()
+    }
+    feedback["summary"] = {
+        "score": 88,
+        "positives": ["45% MoM growth", "Strong unit economics", "Clear acquisition strategy"],
+        "concerns": ["CAC could be optimized"],
+    }
+    return feedback
+
+
+def build_match_prompt(business_pitch, investor_preferences, company_name, user_email):
+    reviewers = ", ".join(
+        f"{persona['displayName']} ({persona['character'].lower()})" if persona["character"] else persona["displayName"]
+        for persona in PERSONAS.values()
     )
+    animal_feedback = json.dumps(example_animal_feedback(), indent=4).replace("\n", "\n        ")
+    prompt = f"""
+    Business Pitch:
+    {business_pitch}
+
+    Investor Preferences:
+    {json.dumps(investor_preferences, indent=2)}
 
-    # Add prior conversation history
-    conversation = []
-    for i in range(1, current_counter):
-        user_file = os.path.join(mascot_dir, f"User{i}.txt")
-        mascot_file = os.path.join(mascot_dir, f"{mascot.capitalize()}{i}.txt")
 
-        if os.path.exists(user_file) and os.path.exists(mascot_file):
-            with open(user_file, "r") as f:
-                user_input = f.read().strip()
-            with open(mascot_file, "r") as f:
-                mascot_response = f.read().strip()
+    You have this data. remmember to only generate (potentially) accurate points, limit points to 2 per strength/weaknesses. Reference actual Pitch and comments by {reviewers} Return a valid JSON to see the match for this company:
 
-            conversation.append(f"Entrepreneur: {user_input}")
-            conversation.append(f"Your response {i}: {mascot_response}")
+    companyName: {company_name}
 
-    if conversation:
-        prompt += "Previous conversation:\n" + "\n".join(conversation) + "\n\n"
+    companyEmail: {user_email}
 
-    prompt += "Your response: "
+    Remember to return only the JSON in the following form don't forget company name and email"
+    {{
+        "id": 1,
+        "companyName": "TechFlow AI",
+        "companyEmail":"companyeemail@email.com",
+        "description": "AI-powered workflow automation platform",
+        "matchScore": 92,
+        "stage": "Seed",
+        "seeking": "$500K",
+        "industry": "AI/ML",
+        "animalFeedback": {animal_feedback}
+    }}
+    """
     return prompt
 
-def convert_audio_to_text(audio_data):
-    """Convert audio data to text using Google's Speech Recognition."""
-    recognizer = sr.Recognizer()
-    temp_webm_path = None
-    wav_path = None
 
-    try:
-        # Create temporary files
-        with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as temp_webm:
-            temp_webm_path = temp_webm.name
-            temp_webm.write(audio_data)
-
-        # Convert webm to wav using pydub
-        audio = AudioSegment.from_file(temp_webm_path, format="webm")
-        wav_path = temp_webm_path.replace(".webm", ".wav")
-        audio.export(wav_path, format="wav")
-
-        # Perform speech recognition
-        with sr.AudioFile(wav_path) as source:
-            recorded_audio = recognizer.record(source)
-            try:
-                text = recognizer.recognize_google(recorded_audio)
-                if not text or text.isspace():
-                    print("No speech detected in audio")
-                    return None
-                return text
-            except sr.UnknownValueError:
-                print("No speech detected in audio")
-                return None
-            except sr.RequestError as e:
-                print(f"Google Speech Recognition service error: {str(e)}")
-                return None
+def score_match(business_pitch, investor_preferences, company_name, user_email, use_cache=True):
+    """Ask the LLM to score one pitch against one investor profile and return the (unsaved) match entry."""
+    def is_valid(content):
+        try:
+            parse_match_response(content, company_name, user_email)
+            return True
+        except InvalidMatchResponse:
+            return False
+
+    print("Sending data to OpenAI API...")
+    # A completion that fails validation is not cached, so a retry gets a fresh answer
+    gpt_response = chat_completion(
+        [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": build_match_prompt(business_pitch, investor_preferences, company_name, user_email)},
+        ],
+        model=MATCH_MODEL,
+        max_tokens=800,
+        temperature=0.7,
+        use_cache=use_cache,
+        response_format={"type": "json_object"} if MATCH_STRUCTURED_OUTPUT else None,
+        accept=is_valid
+    )
 
-    except Exception as e:
-        print(f"Error in convert_audio_to_text: {str(e)}")
-        return None
-    finally:
-        # Clean up temporary files
-        if temp_webm_path and os.path.exists(temp_webm_path):
-            os.remove(temp_webm_path)
-        if wav_path and os.path.exists(wav_path):
-            os.remove(wav_path)
+    # Parse OpenAI Response; prose, code fences and trailing commas around the JSON are tolerated
+    print(f"OpenAI Response: {gpt_response}")
+    return parse_match_response(gpt_response, company_name, user_email)
 
 
-@app.route('/speech-to-text', methods=['POST'])
-def speech_to_text():
+def run_process_match(data, session_id, use_cache=True):
     """
-    Endpoint to convert speech audio data to text.
+    Scores the session's pitch against the investor preferences and stores the match.
+    Returns (payload, status).
     """
-    try:
-        print("\n=== New Speech-to-Text Request ===")
-        audio_data = request.json.get("audio")
-        if not audio_data:
-            print("Error: No audio data provided")
-            return jsonify({"error": "No audio data provided", "success": False}), 400
-
-        # Remove the data URL prefix if present
-        if "base64," in audio_data:
-            audio_data = audio_data.split("base64,")[1]
-
-        try:
-            # Decode base64 audio data
-            decoded_audio = base64.b64decode(audio_data)
-            print("Audio data decoded successfully")
-        except Exception as e:
-            print(f"Error decoding base64: {str(e)}")
-            return jsonify({"error": "Invalid audio data format", "success": False}), 400
-
-        # Convert audio to text
-        text = convert_audio_to_text(decoded_audio)
-        if not text:
-            print("Error: No text generated from audio")
-            return jsonify({"error": "Could not transcribe audio", "success": False}), 400
-
-        print(f"Transcribed text: {text}")
-        return jsonify({"text": text, "success": True})
+    # Paths
+    print(f"Paths:\n Investor Info Path: {INVESTOR_PREFERENCES_PATH}\n Match DB Path: {matches.path}")
+
+    company_name = data.get("companyName")
+    user_email = data.get("userEmail")
+    print(f"Company Name: {company_name}")
+    print(f"User Email: ", user_email)
+
+    # Read Business Pitch
+    business_pitch = store.get_pitch(session_id)
+    if not business_pitch:
+        print("Error: Business pitch not found.")
+        return {"error": "Business pitch not found."}, 404
+
+    business_pitch = business_pitch.strip()
+    print(f"Business Pitch: {business_pitch[:100]}...")  # Truncate for readability
+
+    # Read Investor Preferences
+    investor_preferences = load_investor_preferences()
+    if investor_preferences is None:
+        print("Error: Investor preferences file not found.")
+        return {"error": "Investor preferences file not found."}, 404
+    print(f"Investor Preferences: {json.dumps(investor_preferences, indent=2)}")
+
+    # Read Mascot Responses
+    mascots_data = {}
+    for mascot, persona in PERSONAS.items():
+        mascot_texts = store.transcript(session_id, mascot)
+        if not mascot_texts:
+            print(f"Warning: No conversation for {persona['name']}. Skipping.")
+            continue
+        mascots_data[persona["name"]] = mascot_texts
+        print(f"{persona['name']} Data: {mascot_texts}")
 
+    try:
+        match_entry = score_match(business_pitch, investor_preferences, company_name, user_email, use_cache)
+    except InvalidMatchResponse as e:
+        print(f"Invalid match response: {str(e)}")
+        return {"error": "Invalid JSON format in OpenAI response", "details": str(e)}, 500
     except Exception as e:
-        print(f"Error in speech-to-text endpoint: {str(e)}")
-        return jsonify({"error": str(e), "success": False}), 500
-
+        print(f"Error processing OpenAI API response: {str(e)}")
+        return {"error": str(e)}, 500
 
-@app.route("/SaveInvestorPreferences", methods=["POST"])
-def save_investor_preferences():
-    """
-    Endpoint to save investor preferences in a JSON file.
-    """
     try:
-        # Get the JSON data from the request
-        preferences_data = request.get_json()
-        if not preferences_data:
-            return jsonify({"error": "No data provided"}), 400
-        
-        # Create a unique filename (e.g., timestamp-based or static for simplicity)
-        file_name = "investor_preferences.json"
-        file_path = os.path.join(BASE_DIR,"investorInfo", file_name)
+        # Store the match; its id is assigned by the insert
+        match_entry = matches.add(match_entry)
+        print(f"Match {match_entry['id']} added to the match store successfully.")
 
-        # Save data to a JSON file
-        with open(file_path, "w") as file:
-            json.dump(preferences_data, file, indent=4)
-
-        return jsonify({"message": "Investor preferences saved successfully!"}), 200
+        return {"message": "Match entry added successfully!", "entry": match_entry}, 200
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500 
-
-
-import openai
+        print(f"Error storing match: {str(e)}")
+        return {"error": str(e)}, 500
 
-# Load OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
 
 @app.route("/processMatch", methods=["POST"])
 def process_match():
     """
-    Combines data, sends it to OpenAI, and updates matches_db.json with the match information.
+    Combines data, sends it to OpenAI, and adds the match to the match store.
+    Concurrent duplicates (double-clicks, retries) share one OpenAI call; an Idempotency-Key
+    header also replays the stored result to later retries.
+    With "async": true (or Prefer: respond-async) it returns 202 and a job to poll at /jobs/<id>.
     """
     try:
         print("=== processMatch Endpoint Called ===")
 
-        # Paths
-        business_pitch_path = os.path.join(BASE_DIR, "BusinessPitch", "BusinessPitch.txt")
-        investor_info_path = os.path.join(BASE_DIR, "investorInfo", "investor_preferences.json")
-        match_db_path = os.path.join(BASE_DIR, "matches_db.json")
-        print(f"Paths:\n Business Pitch Path: {business_pitch_path}\n Investor Info Path: {investor_info_path}\n Match DB Path: {match_db_path}")
-
         # Parse JSON payload
         data = request.json
         print(f"Request Payload: {data}")
@@ -293,198 +253,332 @@ def process_match():
             print("Error: 'companyName' missing in payload")
             return jsonify({"error": "'companyName' is required"}), 400
 
-        company_name = data.get("companyName")
-        user_email = data.get("userEmail")
-        print(f"Company Name: {company_name}")
-        print(f"User Email: ", user_email)
-
-        # Read Business Pitch
-        if not os.path.exists(business_pitch_path):
-            print("Error: Business pitch file not found.")
-            return jsonify({"error": "Business pitch file not found."}), 404
-
-        with open(business_pitch_path, "r") as f:
-            business_pitch = f.read().strip()
-        print(f"Business Pitch: {business_pitch[:100]}...")  # Truncate for readability
-
-        # Read Investor Preferences
-        if not os.path.exists(investor_info_path):
-            print("Error: Investor preferences file not found.")
-            return jsonify({"error": "Investor preferences file not found."}), 404
-
-        with open(investor_info_path, "r") as f:
-            investor_preferences = json.load(f)
-        print(f"Investor Preferences: {json.dumps(investor_preferences, indent=2)}")
-
-        # Read Mascot Responses
-        mascots_data = {}
-        for mascot in ["Lion", "Owl", "Tusk"]:
-            mascot_dir = os.path.join(BASE_DIR, mascot)
-            print(f"Checking Mascot Directory: {mascot_dir}")
-
-            if not os.path.exists(mascot_dir):
-                print(f"Warning: Directory for {mascot} not found. Skipping.")
-                continue
-
-            mascot_texts = []
-            for filename in sorted(os.listdir(mascot_dir)):
-                if filename.endswith(".txt"):
-                    file_path = os.path.join(mascot_dir, filename)
-                    with open(file_path, "r") as f:
-                        mascot_texts.append(f.read().strip())
-            mascots_data[mascot] = mascot_texts
-            print(f"{mascot} Data: {mascot_texts}")
-
-        # Build Prompt
-        prompt = f"""
-        Business Pitch:
-        {business_pitch}
-
-        Investor Preferences:
-        {json.dumps(investor_preferences, indent=2)}
-
-
-        You have this data. remmember to only generate (potentially) accurate points, limit points to 2 per strength/weaknesses. Reference actual Pitch and comments by Leo the Lion (visionary), Mr. Tusk (finance guru), and Professor Hoot Return a valid JSON to see the match for this company:
-
-        companyName: {company_name}
-
-        companyEmail: {user_email}
-
-        Remember to return only the JSON in the following form don't forget company name and email"
-        {{
-            "id": 1,
-            "companyName": "TechFlow AI",
-            "companyEmail":"companyeemail@email.com",
-            "description": "AI-powered workflow automation platform",
-            "matchScore": 92,
-            "stage": "Seed",
-            "seeking": "$500K",
-            "industry": "AI/ML",
-            "animalFeedback": {{
-                "leo": {{
-                    "score": 95,
-                    "positives": [
-                        "Strong founder with previous exits",
-                        "Clear vision for market disruption",
-                        "Well-defined growth strategy"
-                    ],
-                    "concerns": ["Competitive market space"]
-                }},
-                "Professor Hoot": {{
-                    "score": 90,
-                    "positives": [
-                        "Sophisticated ML architecture",
-                        "Scalable cloud infrastructure",
-                        "Strong technical team"
-                    ],
-                    "concerns": ["Need for ongoing ML training resources"]
-                }},
-                "summary": {{
-                    "score": 88,
-                    "positives": [
-                        "45% MoM growth",
-                        "Strong unit economics",
-                        "Clear acquisition strategy"
-                    ],
-                    "concerns": ["CAC could be optimized"]
-                }},
-                "Mr. Tusk": {{
-                    "score": 94,
-                    "positives": [
-                        "$5B TAM",
-                        "Clear competitive advantage",
-                        "Strong market positioning"
-                    ],
-                    "concerns": ["Market education needed"]
-                }}
-            }}
-        }}
-        """
-        
-        try:
-            print("Sending data to OpenAI API...")
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "system", "content": "You are a helpful assistant."}, {"role": "user", "content": prompt}],
-                max_tokens=800,
-                temperature=0.7
-            )
+        session_id = session_id_from(request, data)
+        idempotency_key = idempotency_key_from(request, data)
+        if idempotency_key:
+            # Scoped to the session and company, so another client reusing the key can't receive this match
+            key, remember = f"idempotency:{session_id}:{data.get('companyName')}:{idempotency_key}", True
+        else:
+            key, remember = f"match:{session_id}:{data.get('companyName')}:{data.get('userEmail')}", False
 
-            # Parse OpenAI Response
-            gpt_response = response["choices"][0]["message"]["content"]
-            print(f"OpenAI Response: {gpt_response}")
+        use_cache = not bypass_requested(request, data)
 
-            # Validate JSON response
+        if async_requested(request, data):
             try:
-                match_entry = json.loads(gpt_response)
-            except json.JSONDecodeError as e:
-                print(f"JSON Decoding Error: {str(e)} - Response was: {gpt_response}")
-                return jsonify({"error": "Invalid JSON format in OpenAI response"}), 500
+                job = jobs.submit(
+                    "processMatch", match_flights.do,
+                    key, run_process_match, data, session_id, use_cache, remember=remember
+                )
+            except JobQueueFull as e:
+                return queue_full(e)
+            return accepted(job)
 
-            # Update matches_db.json
-            if not os.path.exists(match_db_path):
-                print("Match DB file not found. Creating a new one.")
-                with open(match_db_path, "w") as f:
-                    json.dump([], f, indent=4)
+        result, status = match_flights.do(key, run_process_match, data, session_id, use_cache, remember=remember)
+        return jsonify(result), status
 
-            with open(match_db_path, "r") as f:
-                matches_db = json.load(f)
+    except Exception as e:
+        print(f"Error in processMatch: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
-            match_entry["id"] = len(matches_db) + 1
-            matches_db.append(match_entry)
 
-            with open(match_db_path, "w") as f:
-                json.dump(matches_db, f, indent=4)
-            print("Match added to matches_db.json successfully.")
+# Batch scoring: every pitch x investor pair is one LLM call; each batch keeps at most
+# MATCH_BATCH_CONCURRENCY calls in flight on a pool shared by all batches
+MATCH_BATCH_CONCURRENCY = int(os.getenv("MATCH_BATCH_CONCURRENCY", 8))
+MATCH_BATCH_MAX_PAIRS = int(os.getenv("MATCH_BATCH_MAX_PAIRS", 500))
+# Default shortlist size per investor for the TF-IDF prefilter; 0 sends every pair to the LLM
+MATCH_PREFILTER_TOP_K = int(os.getenv("MATCH_PREFILTER_TOP_K", 0))
+# Scored matches are written in one transaction per this many
+MATCH_BATCH_WRITE_SIZE = 50
+batch_executor = ThreadPoolExecutor(max_workers=int(os.getenv("MATCH_BATCH_WORKERS", 32)))
 
-            return jsonify({"message": "Match entry added successfully!", "entry": match_entry}), 200
 
+def run_process_match_batch(pitches, investors, concurrency, use_cache=True, top_k=0):
+    """
+    Scores every pitch against every investor profile and stores the matches in bulk.
+    With top_k, a local TF-IDF pass first ranks all pitches for each investor and only
+    the top_k per investor go to the LLM; the rest are reported as skipped.
+    Returns (payload, status) with one result per pair, in pitch-major order.
+    """
+    # A pitch is given inline or read once from its session, not once per investor
+    business_pitches = [
+        pitch.get("pitch") or (store.get_pitch(pitch["sessionId"]) if pitch.get("sessionId") else None)
+        for pitch in pitches
+    ]
+
+    prefilter_scores, shortlisted = None, None
+    if top_k and top_k < len(pitches):
+        documents = []
+        for pitch, business_pitch in zip(pitches, business_pitches):
+            # The mascots' questions and the founder's answers say a lot about industry and stage
+            transcripts = [
+                text for mascot in PERSONAS for text in store.transcript(pitch["sessionId"], mascot)
+            ] if pitch.get("sessionId") else []
+            documents.append(" ".join([pitch.get("companyName", ""), business_pitch or ""] + transcripts))
+        prefilter_scores = tfidf_scores(documents, [preference_text(investor) for investor in investors])
+        shortlisted = {
+            (pitch_index, investor_index)
+            for investor_index, ranked in enumerate(shortlist(prefilter_scores, top_k))
+            for pitch_index in ranked
+        }
+
+    results, work = [], []
+    for pitch_index, (pitch, business_pitch) in enumerate(zip(pitches, business_pitches)):
+        for investor_index, investor in enumerate(investors):
+            result = {"pitchIndex": pitch_index, "investorIndex": investor_index, "companyName": pitch.get("companyName")}
+            results.append(result)
+            if prefilter_scores is not None:
+                result["prefilterScore"] = round(float(prefilter_scores[pitch_index, investor_index]), 4)
+            if not business_pitch:
+                result.update(status="error", httpStatus=404, error="Business pitch not found.")
+                continue
+            if shortlisted is not None and (pitch_index, investor_index) not in shortlisted:
+                result.update(status="skipped")
+                continue
+            work.append((len(results) - 1, investor, (
+                business_pitch.strip(), investor, pitch.get("companyName"), pitch.get("userEmail"), use_cache
+            )))
+
+    scored = []
+
+    def store_scored():
+        if not scored:
+            return
+        try:
+            stored = matches.add_many([entry for _, entry in scored])
+            for (index, _), entry in zip(scored, stored):
+                results[index].update(status="ok", httpStatus=200, entry=entry)
         except Exception as e:
-            print(f"Error processing OpenAI API response: {str(e)}")
-            return jsonify({"error": str(e)}), 500
+            print(f"Error storing batch matches: {str(e)}")
+            for index, _ in scored:
+                results[index].update(status="error", httpStatus=500, error=str(e))
+        scored.clear()
+
+    def collect(futures):
+        for future in futures:
+            index, investor = pending.pop(future)
+            try:
+                entry = future.result()
+                if isinstance(investor, dict) and "id" in investor:
+                    entry["investorId"] = investor["id"]
+                scored.append((index, entry))
+            except InvalidMatchResponse as e:
+                print(f"Invalid match response: {str(e)}")
+                results[index].update(status="error", httpStatus=500, error=f"Invalid JSON format in OpenAI response: {str(e)}")
+            except Exception as e:
+                print(f"Error scoring batch item: {str(e)}")
+                results[index].update(status="error", httpStatus=500, error=str(e))
+        if len(scored) >= MATCH_BATCH_WRITE_SIZE:
+            store_scored()
+
+    pending = {}
+    for index, investor, args in work:
+        if len(pending) >= concurrency:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+        pending[batch_executor.submit(score_match, *args)] = (index, investor)
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        collect(done)
+    store_scored()
+
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+    skipped = sum(1 for result in results if result["status"] == "skipped")
+    return {
+        "message": f"Scored {succeeded} of {len(results)} pitch/investor pairs",
+        "succeeded": succeeded,
+        "skipped": skipped,
+        "failed": len(results) - succeeded - skipped,
+        "results": results
+    }, 200
+
+
+@app.route("/processMatchBatch", methods=["POST"])
+def process_match_batch():
+    """
+    Scores many pitches against many investor profiles in one request.
+
+    Body: {"pitches": [{"companyName", "userEmail", "sessionId" or "pitch"}, ...],
+           "investors": [<investor preferences>, ...]  (default: the saved preferences),
+           "concurrency": <LLM calls in flight, up to MATCH_BATCH_CONCURRENCY>,
+           "topK": <only LLM-score each investor's top K pitches by TF-IDF similarity>}
+    Every pair gets its own result with a status, so one bad completion doesn't fail
+    the batch. With "async": true it returns 202 and a job to poll at /jobs/<id>.
+    """
+    try:
+        data = request.json or {}
+        pitches = data.get("pitches")
+        if not isinstance(pitches, list) or not pitches:
+            return jsonify({"error": "'pitches' must be a non-empty list"}), 400
+        if not all(isinstance(pitch, dict) and pitch.get("companyName") for pitch in pitches):
+            return jsonify({"error": "Every pitch needs a 'companyName'"}), 400
+
+        investors = data.get("investors")
+        if investors is None:
+            saved = load_investor_preferences()
+            if saved is None:
+                return jsonify({"error": "Investor preferences file not found."}), 404
+            investors = [saved]
+        if not isinstance(investors, list) or not investors:
+            return jsonify({"error": "'investors' must be a non-empty list"}), 400
+
+        pairs = len(pitches) * len(investors)
+        if pairs > MATCH_BATCH_MAX_PAIRS:
+            return jsonify({"error": f"A batch may score at most {MATCH_BATCH_MAX_PAIRS} pairs, got {pairs}"}), 400
+
+        try:
+            concurrency = min(max(int(data.get("concurrency", MATCH_BATCH_CONCURRENCY)), 1), MATCH_BATCH_CONCURRENCY)
+            top_k = max(int(data.get("topK", MATCH_PREFILTER_TOP_K)), 0)
+        except (TypeError, ValueError):
+            return jsonify({"error": "'concurrency' and 'topK' must be numbers"}), 400
+        use_cache = not bypass_requested(request, data)
+
+        if async_requested(request, data):
+            try:
+                job = jobs.submit("processMatchBatch", run_process_match_batch, pitches, investors, concurrency, use_cache, top_k)
+            except JobQueueFull as e:
+                return queue_full(e)
+            return accepted(job)
+
+        result, status = run_process_match_batch(pitches, investors, concurrency, use_cache, top_k)
+        return jsonify(result), status
 
     except Exception as e:
-        print(f"Error in processMatch: {str(e)}")
+        print(f"Error in processMatchBatch: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
+# Page size when a /getMatches caller doesn't pass ?limit, and the most it may ask for
+MATCHES_PAGE_SIZE = int(os.getenv("MATCHES_PAGE_SIZE", 100))
+MATCHES_MAX_PAGE_SIZE = int(os.getenv("MATCHES_MAX_PAGE_SIZE", 1000))
+
+
+def list_param(name):
+    """Values of a query parameter given repeated (?stage=Seed&stage=Series A) or comma-separated."""
+    return [value.strip() for raw in request.args.getlist(name) for value in raw.split(",") if value.strip()]
+
+
 @app.route("/getMatches", methods=["GET"])
 def get_matches():
     """
-    Endpoint to retrieve all matches from the matches_db.json file.
+    Endpoint to retrieve matches from the match store, one page at a time.
+
+    Query parameters (all optional):
+      industry, stage   exact values, repeated or comma-separated
+      minScore          lowest matchScore to include
+      company           substring of companyName
+      sort              id (default), matchScore, companyName, industry or stage; prefix with - for descending
+      fields            comma-separated keys to return (id is always included)
+      limit             page size (default MATCHES_PAGE_SIZE)
+      cursor            the nextCursor of the previous page
+
+    Responses carry an ETag and Last-Modified; a conditional GET for a page that hasn't
+    changed gets 304 without touching the matches.
     """
     try:
-        match_db_path = os.path.join(BASE_DIR, "matches_db.json")
-        
-        # Check if file exists
-        if not os.path.exists(match_db_path):
-            return jsonify({
-                "error": "Matches database not found",
-                "matches": []
-            }), 404
-            
-        # Read and return the JSON file
-        with open(match_db_path, "r") as f:
-            matches_db = json.load(f)
-            
-        return jsonify({
-            "message": "Matches retrieved successfully",
-            "matches": matches_db
-        }), 200
-            
-    except json.JSONDecodeError as e:
-        return jsonify({
-            "error": f"Invalid JSON format in database: {str(e)}",
-            "matches": []
-        }), 500
+        sort = request.args.get("sort", "id")
+        descending = sort.startswith("-")
+        sort = sort.lstrip("-")
+        if sort not in SORT_COLUMNS:
+            return jsonify({"error": f"sort must be one of {', '.join(SORT_COLUMNS)}", "matches": []}), 400
+        try:
+            limit = min(max(int(request.args.get("limit", MATCHES_PAGE_SIZE)), 1), MATCHES_MAX_PAGE_SIZE)
+            min_score = float(request.args["minScore"]) if request.args.get("minScore") else None
+        except ValueError:
+            return jsonify({"error": "limit and minScore must be numbers", "matches": []}), 400
+
+        # The version moves on every insert, so (query, version) identifies the page's content
+        max_id, last_modified = matches.version()
+        query = "&".join(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+        etag = hashlib.sha1(f"{query}|{max_id}|{last_modified}".encode("utf-8")).hexdigest()
+        # HTTP dates have whole-second precision, so Last-Modified is the end of the second of the
+        # latest insert, and only sent once that second is over: a later insert then always lands
+        # in a later second and can't hide behind If-Modified-Since
+        last_modified_at = datetime.fromtimestamp(int(last_modified) + 1, tz=timezone.utc)
+        last_modified_final = bool(last_modified) and time.time() >= int(last_modified) + 1
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            not_modified = bool(request.if_modified_since and last_modified and last_modified_at <= request.if_modified_since)
+        if not_modified:
+            response = app.response_class(status=304)
+        else:
+            page, next_cursor = matches.page(
+                industries=list_param("industry"),
+                stages=list_param("stage"),
+                min_score=min_score,
+                company=request.args.get("company"),
+                sort=sort,
+                descending=descending,
+                cursor=request.args.get("cursor"),
+                limit=limit,
+            )
+            fields = list_param("fields")
+            if fields:
+                page = [{key: entry[key] for key in ["id"] + fields if key in entry} for entry in page]
+            response = jsonify({
+                "message": "Matches retrieved successfully",
+                "matches": page,
+                "nextCursor": next_cursor,
+                "limit": limit
+            })
+
+        response.set_etag(etag, weak=True)
+        if last_modified_final:
+            response.last_modified = last_modified_at
+        # Let browsers keep the page but revalidate it every time
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e), "matches": []}), 400
     except Exception as e:
         return jsonify({
             "error": f"Error retrieving matches: {str(e)}",
             "matches": []
         }), 500
-    
+
+@app.route("/exportMatches", methods=["GET"])
+def export_matches():
+    """
+    Streams matches as NDJSON, one JSON object per line in id order, reading the store
+    in batches so memory use doesn't grow with the export.
+
+    Takes the /getMatches filters (industry, stage, minScore, company) plus sinceId:
+    only matches with a higher id are exported, so a nightly sync passes the last id
+    it received.
+    """
+    try:
+        since_id = int(request.args.get("sinceId", 0))
+        min_score = float(request.args["minScore"]) if request.args.get("minScore") else None
+    except ValueError:
+        return jsonify({"error": "sinceId and minScore must be numbers"}), 400
+
+    rows = matches.iter_matches(
+        industries=list_param("industry"),
+        stages=list_param("stage"),
+        min_score=min_score,
+        company=request.args.get("company"),
+        since_id=since_id,
+    )
+
+    def generate():
+        for entry in rows:
+            yield json.dumps(entry) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route("/cache-stats", methods=["GET"])
+def cache_stats():
+    """
+    Endpoint to report hit/miss counters of this process's LLM completion cache.
+    """
+    return jsonify(completion_cache.stats()), 200
+
 if __name__ == "__main__":
-    print("\n=== Starting Tusk Server ===")
-    print(f"Business Pitch Directory: {BUSINESS_PITCH_DIR}")
-    print(f"Tusk Directory: {MASCOTS_DIR['tusk']}")
+    print("\n=== Starting Match Server ===")
+    print(f"Conversation Store: {store.path}")
+    print(f"Match Store: {matches.path}")
+    print(f"Investor Info Directory: {INVESTOR_INFO_DIR}")
     app.run(debug=True, port=5002)
\ No newline at end of file
@@ -1,8 +1,13 @@
-from flask import Flask, jsonify
+from flask import Flask, request, jsonify
 from flask_cors import CORS
 import openai
 import os
 from dotenv import load_dotenv
+from personaRegistry import load_personas, MAX_TURNS
+from conversationStore import open_conversation_store, session_id_from
+from completionCache import bypass_requested
+from llmClient import chat_completion, completion_cache
+from jobQueue import JobQueue, JobQueueFull, async_requested, accepted, queue_full, register_job_routes
 
 # Load environment variables from .env
 load_dotenv(dotenv_path=os.path.join("instance", ".env"))
@@ -13,27 +18,28 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Base directories
+# Base directory (the latest summary is written under it)
 BASE_DIR = "backend"
-BUSINESS_PITCH_DIR = os.path.join(BASE_DIR, "BusinessPitch")
-MASCOTS_DIR = {
-    "lion": os.path.join(BASE_DIR, "Lion"),
-    "owl": os.path.join(BASE_DIR, "Owl"),
-    "tusk": os.path.join(BASE_DIR, "Tusk"),
-}
-
-def get_final_response(mascot_dir, mascot):
-    """Get the final response (text and emotion) from a mascot's directory."""
+PERSONAS = load_personas()
+
+# Conversations are read from the store the mascot server writes to
+store = open_conversation_store()
+
+# ?async=1 runs /generate-summary as a background job that clients poll at /jobs/<id>
+jobs = JobQueue(
+    workers=int(os.getenv("JOB_WORKERS", 8)),
+    max_queue=int(os.getenv("JOB_MAX_QUEUE", 64)),
+    results_ttl=int(os.getenv("JOB_TTL", 3600)),
+)
+register_job_routes(app, jobs)
+
+def get_final_response(session_id, mascot):
+    """Get the final response (text and emotion) a mascot gave in a session."""
     try:
-        # Look for the last response file (Lion3.txt, Owl3.txt, or Tusk3.txt)
-        response_file = os.path.join(mascot_dir, f"{mascot.capitalize()}3.txt")
-        
-        if not os.path.exists(response_file):
+        content = store.final_response(session_id, mascot, MAX_TURNS)
+        if not content:
             return None, None
-            
-        with open(response_file, "r") as f:
-            content = f.read().strip()
-            
+
         # Split the content into message and emotion
         if "---" in content:
             message, emotion = content.rsplit("---", 1)
@@ -44,79 +50,69 @@ def get_final_response(mascot_dir, mascot):
         print(f"Error reading {mascot}'s final response: {str(e)}")
         return None, None
 
-def get_business_pitch():
-    """Get the original business pitch."""
+def get_business_pitch(session_id):
+    """Get the original business pitch for a session."""
     try:
-        pitch_file = os.path.join(BUSINESS_PITCH_DIR, "BusinessPitch.txt")
-        if not os.path.exists(pitch_file):
-            return None
-            
-        with open(pitch_file, "r") as f:
-            return f.read().strip()
+        pitch = store.get_pitch(session_id)
+        return pitch.strip() if pitch else None
     except Exception as e:
         print(f"Error reading business pitch: {str(e)}")
         return None
 
-@app.route('/generate-summary', methods=['GET'])
-def generate_summary():
-    """Generate a summary of the pitch and mascot responses."""
+def run_generate_summary(session_id, use_cache=True):
+    """Summarize a session's pitch and final mascot responses. Returns (payload, status)."""
     try:
         # Get the business pitch
-        business_pitch = get_business_pitch()
+        business_pitch = get_business_pitch(session_id)
         if not business_pitch:
-            return jsonify({"error": "Business pitch not found"}), 404
+            return {"error": "Business pitch not found"}, 404
 
         # Get final responses from all mascots
         mascot_responses = {}
-        for mascot, mascot_dir in MASCOTS_DIR.items():
-            response, emotion = get_final_response(mascot_dir, mascot)
+        for mascot in PERSONAS:
+            response, emotion = get_final_response(session_id, mascot)
             if response and emotion:
                 mascot_responses[mascot] = {
                     "response": response,
                     "mood": emotion
                 }
 
-        # If we don't have responses from all mascots, return an error
-        if len(mascot_responses) != 3:
-            return jsonify({"error": "Not all mascot responses are available"}), 400
+        # If we don't have responses from every registered mascot, return an error
+        missing = [persona["displayName"] for mascot, persona in PERSONAS.items() if mascot not in mascot_responses]
+        if missing:
+            return {"error": "Not all mascot responses are available", "missing": missing}, 400
 
         # Create the prompt for OpenAI
-        prompt = f"""Analyze this business pitch and the feedback from three venture capitalists:
+        feedback = "\n\n".join(
+            f"{number}. {persona['displayName']}" + (f" ({persona['character']} VC)" if persona["character"] else "")
+            + f":\nResponse: {mascot_responses[mascot]['response']}\nMood: {mascot_responses[mascot]['mood']}"
+            for number, (mascot, persona) in enumerate(PERSONAS.items(), 1)
+        )
+        prompt = f"""Analyze this business pitch and the feedback from {len(PERSONAS)} venture capitalists:
 
 Business Pitch:
 {business_pitch}
 
 Venture Capitalist Feedback:
-1. Leo the Lion (Direct and analytical VC):
-Response: {mascot_responses['lion']['response']}
-Mood: {mascot_responses['lion']['mood']}
-
-2. Oliver the Owl (Risk-focused and detail-oriented VC):
-Response: {mascot_responses['owl']['response']}
-Mood: {mascot_responses['owl']['mood']}
-
-3. Tommy the Tusk (Innovation-focused and market-oriented VC):
-Response: {mascot_responses['tusk']['response']}
-Mood: {mascot_responses['tusk']['mood']}
+{feedback}
 
 Please provide a concise summary (max 150 words) that:
 1. Evaluates the overall reception of the pitch
 2. Identifies key strengths and concerns raised
-3. Provides a balanced conclusion based on all three VCs' perspectives
+3. Provides a balanced conclusion based on all the VCs' perspectives
 """
 
         # Generate summary using OpenAI
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
+        # Unchanged mascot responses produce the same prompt, so repeat calls come from the cache
+        summary = chat_completion(
+            [
                 {"role": "system", "content": "You are a professional business analyst synthesizing venture capitalist feedback."},
                 {"role": "user", "content": prompt}
             ],
             max_tokens=300,
-            temperature=0.7
-        )
-
-        summary = response["choices"][0]["message"]["content"].strip()
+            temperature=0.7,
+            use_cache=use_cache
+        ).strip()
 
         # Save the summary to a file
         summary_dir = os.path.join(BASE_DIR, "Summary")
@@ -125,19 +121,45 @@ Please provide a concise summary (max 150 words) that:
         with open(summary_file, "w") as f:
             f.write(summary)
 
-        return jsonify({
+        return {
             "summary": summary,
             "mascot_responses": mascot_responses,
             "business_pitch": business_pitch
-        })
+        }, 200
 
     except Exception as e:
         print(f"Error generating summary: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        return {"error": str(e)}, 500
+
+
+@app.route('/generate-summary', methods=['GET'])
+def generate_summary():
+    """
+    Generate a summary of the pitch and mascot responses.
+    With ?async=1 (or Prefer: respond-async) it returns 202 and a job to poll at /jobs/<id>.
+    """
+    session_id = session_id_from(request)
+    use_cache = not bypass_requested(request)
+
+    if async_requested(request):
+        try:
+            job = jobs.submit("generateSummary", run_generate_summary, session_id, use_cache)
+        except JobQueueFull as e:
+            return queue_full(e)
+        return accepted(job)
+
+    result, status = run_generate_summary(session_id, use_cache)
+    return jsonify(result), status
+
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Report hit/miss counters of this process's LLM completion cache."""
+    return jsonify(completion_cache.stats()), 200
 
 
 if __name__ == '__main__':
     print("\n=== Starting Summary Server ===")
-    print(f"Business Pitch Directory: {BUSINESS_PITCH_DIR}")
-    print(f"Mascot Directories: {MASCOTS_DIR}")
+    print(f"Conversation Store: {store.path}")
+    print(f"Mascots: {list(PERSONAS)}")
     app.run(debug=True, port=5001)  # Using port 5001 to avoid conflict with main server
\ No newline at end of file
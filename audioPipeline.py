@@ -0,0 +1,207 @@
+import os
+import subprocess
+import numpy as np
+import speech_recognition as sr
+from speechRecognizers import get_recognizer, SAMPLE_RATE, SAMPLE_WIDTH
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+DECODE_TIMEOUT = float(os.getenv("AUDIO_DECODE_TIMEOUT", 30))
+
+# google (default), sphinx, vosk or stub; stub skips decoding too, for offline runs and load tests
+SPEECH_RECOGNIZER = os.getenv("SPEECH_RECOGNIZER", "google").lower()
+
+# Voice activity is judged on short frames: a frame is silent when its RMS is under SILENCE_RMS
+FRAME_MS = 30
+SILENCE_RMS = int(os.getenv("SPEECH_SILENCE_RMS", 300))
+# A pause this long closes a phrase when transcribing a stream
+MIN_PAUSE_MS = int(os.getenv("SPEECH_MIN_PAUSE_MS", 400))
+# Silence kept on either side of speech so word onsets and endings aren't clipped
+SPEECH_PADDING_MS = int(os.getenv("SPEECH_PADDING_MS", 200))
+# Recordings with less voiced audio than this are "no speech" and never reach the recognizer
+MIN_SPEECH_MS = int(os.getenv("SPEECH_MIN_SPEECH_MS", 150))
+
+
+class AudioDecodeError(Exception):
+    """Raised when ffmpeg cannot decode an upload."""
+
+
+def decode_to_pcm(audio_bytes, input_format=None, allow_truncated=False):
+    """
+    Decode an encoded upload (webm/opus, ogg, mp3, wav, ...) to raw mono 16-bit PCM.
+
+    The bytes go to ffmpeg on stdin and the PCM comes back on stdout, so neither the
+    upload nor the decoded audio is ever written to disk. With allow_truncated, a
+    recording cut off mid-frame (a stream still being uploaded) returns whatever
+    decoded cleanly instead of raising.
+    """
+    # Only the piped input may be opened, whatever the demuxer would like to read
+    command = [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-protocol_whitelist", "cache,pipe"]
+    if input_format:
+        command += ["-f", input_format]
+    command += [
+        # cache: lets the demuxer seek back within the piped input (webm headers need it)
+        "-i", "cache:pipe:0",
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1",
+    ]
+    try:
+        result = subprocess.run(
+            command, input=audio_bytes, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=DECODE_TIMEOUT
+        )
+    except FileNotFoundError:
+        raise AudioDecodeError(f"ffmpeg not found (looked for '{FFMPEG_BINARY}')")
+    except subprocess.TimeoutExpired:
+        raise AudioDecodeError(f"ffmpeg took longer than {DECODE_TIMEOUT}s to decode the audio")
+
+    if result.returncode != 0 and not (allow_truncated and result.stdout):
+        raise AudioDecodeError(result.stderr.decode("utf-8", "replace").strip() or "ffmpeg failed")
+    return result.stdout
+
+
+# One recognizer backend per worker process, with its model loaded by warm_up() when the worker starts
+_recognizer = None
+
+
+def recognizer():
+    global _recognizer
+    if _recognizer is None:
+        _recognizer = get_recognizer(SPEECH_RECOGNIZER)
+    return _recognizer
+
+
+def warm_up():
+    """Worker initializer: load the recognizer's model and run ffmpeg once so the first upload isn't slower."""
+    recognizer()
+    if SPEECH_RECOGNIZER == "stub":
+        return
+    try:
+        subprocess.run([FFMPEG_BINARY, "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+
+
+def frame_energies(pcm):
+    """RMS energy of each FRAME_MS frame of PCM, and the frame size in bytes."""
+    frame_bytes = SAMPLE_RATE * SAMPLE_WIDTH * FRAME_MS // 1000
+    frames = len(pcm) // frame_bytes
+    if not frames:
+        return [], frame_bytes
+    samples = np.frombuffer(pcm, dtype="<i2", count=frames * frame_bytes // SAMPLE_WIDTH)
+    squares = samples.reshape(frames, -1).astype(np.float64) ** 2
+    return np.sqrt(squares.mean(axis=1)).astype(int).tolist(), frame_bytes
+
+
+def speech_end_before_pause(pcm, min_pause_ms=MIN_PAUSE_MS):
+    """
+    Byte offset just after the latest speech that is followed by at least
+    min_pause_ms of silence, or 0 when no phrase has been closed by a pause yet.
+    """
+    energies, frame_bytes = frame_energies(pcm)
+    pause_frames = max(1, min_pause_ms // FRAME_MS)
+    silent_run = 0
+    for i in range(len(energies) - 1, -1, -1):
+        if energies[i] < SILENCE_RMS:
+            silent_run += 1
+            continue
+        if silent_run >= pause_frames:
+            return (i + 1) * frame_bytes
+        silent_run = 0
+    return 0
+
+
+def voiced_segments(pcm):
+    """
+    Byte ranges of PCM that hold speech, padded by SPEECH_PADDING_MS, with pauses
+    shorter than MIN_PAUSE_MS bridged. Also returns how many milliseconds were voiced.
+    """
+    energies, frame_bytes = frame_energies(pcm)
+    voiced = [i for i, energy in enumerate(energies) if energy >= SILENCE_RMS]
+    padding = SPEECH_PADDING_MS // FRAME_MS
+    max_gap = max(1, MIN_PAUSE_MS // FRAME_MS)
+
+    segments = []
+    for i in voiced:
+        start, end = max(0, i - padding), min(len(energies), i + 1 + padding)
+        if segments and (i - segments[-1][2] <= max_gap or start <= segments[-1][1]):
+            segments[-1][1], segments[-1][2] = end, i
+        else:
+            segments.append([start, end, i])
+    return [(start * frame_bytes, end * frame_bytes) for start, end, _ in segments], len(voiced) * FRAME_MS
+
+
+def trim_to_speech(pcm):
+    """
+    Cut leading and trailing silence and long pauses out of a recording, so the
+    recognizer only gets the voiced parts. Returns b"" when there is no speech.
+    """
+    segments, voiced_ms = voiced_segments(pcm)
+    if voiced_ms < MIN_SPEECH_MS:
+        return b""
+    return b"".join(pcm[start:end] for start, end in segments)
+
+
+def recognize_speech(pcm):
+    """Trim PCM to its speech and recognize it, skipping the recognizer entirely when nothing was said."""
+    speech = trim_to_speech(pcm)
+    if not speech:
+        print("No speech detected in audio")
+        return None
+    return recognize_pcm(speech)
+
+
+def recognize_pcm(pcm):
+    """Run the configured recognizer on decoded PCM. Returns None when no speech was recognized."""
+    backend = recognizer()
+    try:
+        text = backend.recognize(pcm)
+        if not text or text.isspace():
+            print("No speech detected in audio")
+            return None
+        return text
+    except sr.UnknownValueError:
+        print("No speech detected in audio")
+        return None
+    except sr.RequestError as e:
+        print(f"{backend.name} speech recognition service error: {str(e)}")
+        return None
+
+
+def transcribe(audio_bytes, input_format=None):
+    """Decode an upload and recognize the speech in it. Returns None when no speech was recognized."""
+    if SPEECH_RECOGNIZER == "stub":
+        return recognize_pcm(audio_bytes)
+
+    try:
+        # Decode straight to PCM over ffmpeg pipes; nothing touches the disk
+        return recognize_speech(decode_to_pcm(audio_bytes, input_format))
+    except Exception as e:
+        print(f"Error in transcribe: {str(e)}")
+        return None
+
+
+def transcribe_new_speech(audio_bytes, input_format, offset, final):
+    """
+    Incremental step for a stream that is still being recorded: decode the recording
+    so far and recognize only the speech after PCM byte `offset` that a pause has
+    closed off (or everything left, when final). Returns (new_offset, text or None);
+    the caller keeps the offset, so finished phrases are never recognized twice.
+    """
+    if SPEECH_RECOGNIZER == "stub":
+        if not final:
+            return offset, None
+        return len(audio_bytes), recognize_pcm(audio_bytes)
+
+    try:
+        pcm = decode_to_pcm(audio_bytes, input_format, allow_truncated=not final)
+    except Exception as e:
+        print(f"Error in transcribe_new_speech: {str(e)}")
+        return offset, None
+
+    end = len(pcm) if final else offset + speech_end_before_pause(pcm[offset:])
+    if end <= offset:
+        return offset, None
+    try:
+        return end, recognize_speech(pcm[offset:end])
+    except Exception as e:
+        print(f"Error in transcribe_new_speech: {str(e)}")
+        return end, None
@@ -0,0 +1,333 @@
+"""
+HTTP load test for the PixelPitch services.
+
+Boots the servers started by Run.py against the stub LLM and speech recognizer
+(LLM_PROVIDER=stub, SPEECH_RECOGNIZER=stub), drives concurrent virtual users
+through a scenario and reports p50/p95/p99 latency, requests per second and
+error rate for every endpoint. Results are saved as JSON so runs can be
+compared across changes.
+
+Usage:
+    python benchmarks/loadtest.py --users 20 --iterations 5
+    python benchmarks/loadtest.py --scenario conversation --users 100 --llm-latency lognormal:0,0.4
+    python benchmarks/loadtest.py --server-mode async --users 200 --duration 60
+    python benchmarks/loadtest.py --no-boot --host 10.0.0.5      # an already running deployment
+
+Scenarios:
+    session       register + login, Lion/Owl/Tusk x 3 turns with a speech upload
+                  per turn, then /generate-summary, /processMatch and /getMatches
+    conversation  Lion x 3 turns
+    panel         /panel x 3 rounds (all mascots at once)
+    speech        /speech-to-text only
+    matches       /getMatches only
+    auth          /register + /login
+"""
+import argparse
+import base64
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+
+PORTS = {"mascot": 5000, "match": 5002, "auth": 5003, "summary": 5004}
+
+PITCH = "We run a neighbourhood bakery that sells bread subscriptions to cafes and households."
+ANSWERS = [
+    "We have 40 paying cafes and grow 15% a month.",
+    "Our margin is 60% and acquisition costs about $30 per customer.",
+    "We want $250K to open a second kitchen.",
+]
+# Not a real recording: the stub recognizer never decodes it, it only has to be uploaded
+AUDIO_BYTES = os.urandom(32 * 1024)
+AUDIO_DATA_URL = "data:audio/webm;base64," + base64.b64encode(AUDIO_BYTES).decode("ascii")
+
+
+def unique_audio_data_url():
+    """A recording no other request has sent, so the server's transcript cache can't answer it."""
+    return "data:audio/webm;base64," + base64.b64encode(AUDIO_BYTES + os.urandom(16)).decode("ascii")
+
+
+class Recorder:
+    """Collects (endpoint, status, latency) samples from every virtual user."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+
+    def add(self, endpoint, status, latency, ok):
+        with self._lock:
+            self.samples.append((endpoint, status, latency, ok))
+
+
+class VirtualUser:
+    def __init__(self, host, recorder, timeout, speech_cache=False):
+        self.host = host
+        self.recorder = recorder
+        self.timeout = timeout
+        self.speech_cache = speech_cache
+        self.http = requests.Session()
+
+    def call(self, service, method, path, endpoint=None, **kwargs):
+        url = f"http://{self.host}:{PORTS[service]}{path}"
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, url, timeout=self.timeout, **kwargs)
+            status = response.status_code
+            ok = status < 400
+        except requests.RequestException:
+            response, status, ok = None, 0, False
+        self.recorder.add(endpoint or path.split("?")[0], status, time.perf_counter() - start, ok)
+        return response
+
+    # Scenario steps
+    def auth(self):
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        self.call("auth", "POST", "/register", json={
+            "email": email, "username": email, "password": "bench-password",
+            "firstName": "Bench", "lastName": "User", "role": "user",
+        })
+        self.call("auth", "POST", "/login", json={"email": email, "password": "bench-password"})
+
+    def speech(self):
+        # Every upload is new unless --speech-cache, so decoding and recognition are what's measured
+        audio = AUDIO_DATA_URL if self.speech_cache else unique_audio_data_url()
+        self.call("mascot", "POST", "/speech-to-text", json={"audio": audio})
+
+    def conversation(self, session_id, mascot, with_speech=False):
+        headers = {"X-Session-Id": session_id}
+        if mascot == "lion":
+            inputs = [PITCH] + ANSWERS[:2]
+        else:
+            # Owl and Tusk open with a static greeting, then take three answers
+            self.call("mascot", "POST", f"/{mascot}/conversation", "/conversation", json={}, headers=headers)
+            inputs = ANSWERS
+        for text in inputs:
+            if with_speech:
+                self.speech()
+            self.call("mascot", "POST", f"/{mascot}/conversation", "/conversation", json={"input": text}, headers=headers)
+
+    def panel(self, session_id):
+        for text in [PITCH] + ANSWERS[:2]:
+            self.call("mascot", "POST", "/panel", json={"input": text, "sessionId": session_id})
+
+    def summary_and_match(self, session_id):
+        self.call("summary", "GET", f"/generate-summary?sessionId={session_id}")
+        self.call("match", "POST", "/processMatch", json={
+            "companyName": f"Bench Bakery {session_id[:6]}",
+            "userEmail": "founder@example.com",
+            "sessionId": session_id,
+        })
+        self.call("match", "GET", "/getMatches")
+
+    def run(self, scenario):
+        session_id = uuid.uuid4().hex
+        if scenario == "session":
+            self.auth()
+            for mascot in ("lion", "owl", "tusk"):
+                self.conversation(session_id, mascot, with_speech=True)
+            self.summary_and_match(session_id)
+        elif scenario == "conversation":
+            self.conversation(session_id, "lion")
+        elif scenario == "panel":
+            self.panel(session_id)
+        elif scenario == "speech":
+            self.speech()
+        elif scenario == "matches":
+            self.call("match", "GET", "/getMatches")
+        elif scenario == "auth":
+            self.auth()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples, wall_time):
+    by_endpoint = {}
+    for endpoint, status, latency, ok in samples:
+        by_endpoint.setdefault(endpoint, []).append((status, latency, ok))
+    by_endpoint["ALL"] = [(status, latency, ok) for _, status, latency, ok in samples]
+
+    report = {}
+    for endpoint, rows in by_endpoint.items():
+        latencies = sorted(latency * 1000 for _, latency, _ in rows)
+        errors = sum(1 for _, _, ok in rows if not ok)
+        statuses = {}
+        for status, _, _ in rows:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        report[endpoint] = {
+            "requests": len(rows),
+            "errors": errors,
+            "errorRate": round(errors / len(rows), 4) if rows else 0.0,
+            "rps": round(len(rows) / wall_time, 2) if wall_time else 0.0,
+            "meanMs": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50Ms": round(percentile(latencies, 50), 2),
+            "p95Ms": round(percentile(latencies, 95), 2),
+            "p99Ms": round(percentile(latencies, 99), 2),
+            "maxMs": round(latencies[-1], 2) if latencies else 0.0,
+            "statuses": statuses,
+        }
+    return report
+
+
+def print_report(report):
+    header = f"{'endpoint':<22}{'reqs':>7}{'err%':>7}{'rps':>9}{'p50ms':>10}{'p95ms':>10}{'p99ms':>10}{'maxms':>10}"
+    print(header)
+    print("-" * len(header))
+    for endpoint in sorted(report, key=lambda e: (e == "ALL", e)):
+        row = report[endpoint]
+        print(
+            f"{endpoint:<22}{row['requests']:>7}{row['errorRate'] * 100:>6.1f}%{row['rps']:>9.2f}"
+            f"{row['p50Ms']:>10.1f}{row['p95Ms']:>10.1f}{row['p99Ms']:>10.1f}{row['maxMs']:>10.1f}"
+        )
+
+
+def wait_for_ports(host, timeout=60):
+    deadline = time.time() + timeout
+    pending = set(PORTS.values())
+    while pending and time.time() < deadline:
+        for port in list(pending):
+            try:
+                with socket.create_connection((host, port), timeout=0.5):
+                    pending.discard(port)
+            except OSError:
+                pass
+        if pending:
+            time.sleep(0.25)
+    if pending:
+        raise RuntimeError(f"Services did not start on ports {sorted(pending)}")
+
+
+def boot_services(args, workdir):
+    """
+    Start Run.py in a scratch working directory so the benchmark never touches the
+    repo's backend/ data, with the stub LLM and speech recognizer switched on.
+    """
+    shutil.copytree(os.path.join(REPO_DIR, "backend", "data"), os.path.join(workdir, "backend", "data"))
+    os.makedirs(os.path.join(workdir, "backend", "investorInfo"), exist_ok=True)
+
+    env = dict(os.environ)
+    env.update({
+        "LLM_PROVIDER": "stub",
+        "LLM_STUB_LATENCY": args.llm_latency,
+        "LLM_STUB_ERROR_RATE": str(args.llm_error_rate),
+        "LLM_CACHE_ENABLED": "1" if args.llm_cache else "0",
+        "SPEECH_RECOGNIZER": "stub",
+        "SPEECH_STUB_LATENCY": str(args.speech_latency),
+        "CONVERSATION_DB": os.path.join(workdir, "backend", "db", "conversations.db"),
+        "SERVER_MODE": args.server_mode,
+    })
+    log = open(os.path.join(workdir, "services.log"), "w")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_DIR, "Run.py")],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+    )
+    wait_for_ports(args.host)
+    return process
+
+
+def stop_services(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the PixelPitch HTTP services.")
+    parser.add_argument("--scenario", default="session",
+                        choices=["session", "conversation", "panel", "speech", "matches", "auth"])
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=3, help="scenario runs per user")
+    parser.add_argument("--duration", type=float, default=0, help="run for this many seconds instead of --iterations")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--no-boot", action="store_true", help="test services that are already running")
+    parser.add_argument("--server-mode", default="", help="SERVER_MODE for Run.py (e.g. async)")
+    parser.add_argument("--llm-latency", default="lognormal:0,0.35", help="stub LLM latency distribution")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-cache", action="store_true", help="leave the completion cache on")
+    parser.add_argument("--speech-cache", action="store_true",
+                        help="send the same recording every time so speech requests hit the transcript cache")
+    parser.add_argument("--speech-latency", type=float, default=0.3, help="stub recognizer latency in seconds")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<time>-<scenario>.json)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pixelpitch-bench-")
+    process = None if args.no_boot else boot_services(args, workdir)
+
+    try:
+        recorder = Recorder()
+        if args.scenario in ("session", "matches"):
+            VirtualUser(args.host, recorder, args.timeout).call(
+                "match", "POST", "/SaveInvestorPreferences",
+                json={"industries": ["Food & Beverage", "AI/ML"], "stages": ["Seed"], "checkSize": "$250K"},
+            )
+            recorder.samples.clear()
+
+        deadline = time.time() + args.duration if args.duration else None
+
+        def user_loop():
+            user = VirtualUser(args.host, recorder, args.timeout, args.speech_cache)
+            runs = 0
+            while (deadline and time.time() < deadline) or (not deadline and runs < args.iterations):
+                user.run(args.scenario)
+                runs += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            for future in [pool.submit(user_loop) for _ in range(args.users)]:
+                future.result()
+        wall_time = time.perf_counter() - started
+
+        report = summarize(recorder.samples, wall_time)
+        print_report(report)
+
+        results = {
+            "startedAt": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "gitRevision": git_revision(),
+            "config": vars(args),
+            "wallTimeSeconds": round(wall_time, 3),
+            "endpoints": report,
+        }
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{args.scenario}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"\nResults saved to {output}")
+
+    finally:
+        if process is not None:
+            stop_services(process)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
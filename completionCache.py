@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheFull(Exception):
+    """Raised by TTLCache.put(..., evict=False) when every slot holds a live entry."""
+
+
+class TTLCache:
+    """
+    A thread-safe LRU cache whose entries also expire `ttl` seconds after being stored.
+    Expired entries are dropped when read and swept from the cold end on every put,
+    so abandoned entries don't linger until LRU pressure reaches them.
+    Counts hits, misses, expirations and evictions.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if time.time() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def _sweep(self, now, full=False):
+        """Drop expired entries, oldest first, stopping at the first live one unless full=True."""
+        for key, (_, stored_at) in list(self._entries.items()):
+            if now - stored_at > self.ttl:
+                del self._entries[key]
+                self.expired += 1
+            elif not full:
+                break
+
+    def put(self, key, value, evict=True):
+        """
+        Store a value. When the cache is full the least recently used entry is evicted,
+        or with evict=False CacheFull is raised instead (replacing a stored key always works).
+        """
+        with self._lock:
+            now = time.time()
+            self._sweep(now)
+            if not evict and key not in self._entries and len(self._entries) >= self.max_entries:
+                self._sweep(now, full=True)
+                if len(self._entries) >= self.max_entries:
+                    raise CacheFull(f"All {self.max_entries} entries are live")
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class DiskCacheTier:
+    """A SQLite-backed second tier so cached completions survive restarts and are shared between processes."""
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(
+            "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_completions_created ON completions (created);"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT response FROM completions WHERE key = ? AND created >= ?", (key, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO completions (key, response, created) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time()),
+        )
+        conn.execute("DELETE FROM completions WHERE created < ?", (time.time() - self.ttl,))
+
+    def stats(self):
+        return {"path": self.path, "hits": self.hits, "misses": self.misses}
+
+
+class CompletionCache:
+    """
+    Caches chat completions by a hash of (model, messages, temperature, max_tokens).
+    Lookups go to the in-memory LRU first and then to the optional disk tier.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, disk_path=None, enabled=True):
+        self.enabled = enabled
+        self.memory = TTLCache(max_entries, ttl)
+        self.disk = DiskCacheTier(disk_path, ttl) if disk_path else None
+
+    @staticmethod
+    def key(model, messages, temperature, max_tokens, response_format=None):
+        request = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        if response_format is not None:
+            request["response_format"] = response_format
+        payload = json.dumps(request, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+        return value
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+
+def bypass_requested(request, data=None):
+    """A caller skips the cache with "noCache": true in the payload or ?noCache=1."""
+    data = data or {}
+    return bool(data.get("noCache")) or request.args.get("noCache") in ("1", "true")
@@ -0,0 +1,175 @@
+import os
+import time
+from sqliteUtil import SQLiteDatabase
+
+DB_PATH = os.path.join("backend", "db", "conversations.db")
+DEFAULT_SESSION = "default"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    pitch TEXT,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions (last_access);
+CREATE TABLE IF NOT EXISTS turns (
+    session_id TEXT NOT NULL,
+    mascot TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    user_input TEXT,
+    response TEXT,
+    PRIMARY KEY (session_id, mascot, turn)
+);
+"""
+
+
+class TurnConflictError(Exception):
+    """Raised when another request already answered the same session/mascot/turn."""
+
+
+class ConversationStore:
+    """
+    Holds the business pitch and every mascot's turn history, keyed by session.
+
+    State lives in a local SQLite database in WAL mode so any number of worker
+    processes (and the match/summary servers) can share it. Prompt assembly is a
+    single indexed read; no per-turn files are opened. Idle sessions expire after
+    `ttl` seconds and the least recently used sessions are evicted once more than
+    `max_sessions` exist.
+    """
+
+    def __init__(self, path=DB_PATH, ttl=24 * 60 * 60, max_sessions=10000, sweep_interval=60):
+        self.path = path
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self.db = SQLiteDatabase(path, "conversations")
+        self._conn().conn.executescript(SCHEMA)
+
+    def _conn(self, write=True):
+        return self.db.transaction(write)
+
+    # Pitch
+    def get_pitch(self, session_id):
+        # A plain read: last_access is only bumped by writes, so lookups never take the write lock
+        with self._conn(write=False) as conn:
+            row = conn.execute("SELECT pitch FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def set_pitch(self, session_id, text):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, pitch, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET pitch = excluded.pitch, last_access = excluded.last_access",
+                (session_id, text, time.time()),
+            )
+        self._maybe_sweep()
+
+    # Turns
+    def get_turn(self, session_id, mascot):
+        """Return the number of responses the mascot has given in this session."""
+        with self._conn(write=False) as conn:
+            row = conn.execute(
+                "SELECT MAX(turn) FROM turns WHERE session_id = ? AND mascot = ? AND response IS NOT NULL",
+                (session_id, mascot),
+            ).fetchone()
+        return row[0] or 0
+
+    def add_user_input(self, session_id, mascot, turn, text):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO turns (session_id, mascot, turn, user_input) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(session_id, mascot, turn) DO UPDATE SET user_input = excluded.user_input",
+                (session_id, mascot, turn, text),
+            )
+            self._touch(conn, session_id)
+
+    def add_response(self, session_id, mascot, turn, text):
+        """
+        Record the mascot's response for a turn, which advances its turn counter.
+        Raises TurnConflictError if another worker already answered this turn.
+        """
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "INSERT INTO turns (session_id, mascot, turn, response) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(session_id, mascot, turn) DO UPDATE SET response = excluded.response "
+                "WHERE turns.response IS NULL",
+                (session_id, mascot, turn, text),
+            )
+            if cursor.rowcount == 0:
+                raise TurnConflictError(f"Turn {turn} for {mascot} was already answered in session {session_id}.")
+            self._touch(conn, session_id)
+
+    def history(self, session_id, mascot, current_turn):
+        """Return [(turn, mascot_response, user_input)] for every completed exchange before current_turn."""
+        with self._conn(write=False) as conn:
+            rows = conn.execute(
+                "SELECT turn, response, user_input FROM turns "
+                "WHERE session_id = ? AND mascot = ? AND turn < ? "
+                "AND response IS NOT NULL AND user_input IS NOT NULL ORDER BY turn",
+                (session_id, mascot, current_turn),
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def final_response(self, session_id, mascot, turn):
+        """Return the mascot's stored response for a turn, or None."""
+        with self._conn(write=False) as conn:
+            row = conn.execute(
+                "SELECT response FROM turns WHERE session_id = ? AND mascot = ? AND turn = ?",
+                (session_id, mascot, turn),
+            ).fetchone()
+        return row[0] if row else None
+
+    def transcript(self, session_id, mascot):
+        """Return every stored response and user input for a mascot, in turn order."""
+        with self._conn(write=False) as conn:
+            rows = conn.execute(
+                "SELECT response, user_input FROM turns WHERE session_id = ? AND mascot = ? ORDER BY turn",
+                (session_id, mascot),
+            ).fetchall()
+        return [text for row in rows for text in row if text]
+
+    def reset(self, session_id):
+        """Forget a session's pitch and history."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    # Expiry and eviction
+    def _touch(self, conn, session_id):
+        conn.execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (time.time(), session_id))
+
+    def _maybe_sweep(self):
+        now = time.time()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        self.sweep(now)
+
+    def sweep(self, now=None):
+        """Drop sessions idle for longer than the TTL, then evict least recently used ones over the cap."""
+        now = now or time.time()
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE last_access < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                "SELECT session_id FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            )
+            conn.execute("DELETE FROM turns WHERE session_id NOT IN (SELECT session_id FROM sessions)")
+
+
+def open_conversation_store():
+    """Open the conversation store configured by CONVERSATION_DB / CONVERSATION_TTL / CONVERSATION_MAX_SESSIONS."""
+    return ConversationStore(
+        path=os.getenv("CONVERSATION_DB", DB_PATH),
+        ttl=int(os.getenv("CONVERSATION_TTL", 24 * 60 * 60)),
+        max_sessions=int(os.getenv("CONVERSATION_MAX_SESSIONS", 10000)),
+    )
+
+
+def session_id_from(request, data=None):
+    """Read the session id from the X-Session-Id header or a "sessionId" field; falls back to the shared default."""
+    data = data or {}
+    return request.headers.get("X-Session-Id") or data.get("sessionId") or request.args.get("sessionId") or DEFAULT_SESSION
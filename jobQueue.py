@@ -0,0 +1,185 @@
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from flask import jsonify, request
+from completionCache import TTLCache
+from latencyStats import latency_summary
+
+
+class JobQueueFull(Exception):
+    """Raised when every worker is busy and the job backlog is at its limit."""
+
+
+class Job:
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.result = None
+        self.http_status = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        job = {
+            "jobId": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "statusUrl": f"/jobs/{self.id}",
+            "queuedAt": self.queued_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
+        if self.started_at:
+            job["queueMs"] = round((self.started_at - self.queued_at) * 1000, 2)
+        if self.finished_at:
+            job["runMs"] = round((self.finished_at - self.started_at) * 1000, 2)
+            job["httpStatus"] = self.http_status
+            job["result"] = self.result
+        return job
+
+
+class JobQueue:
+    """
+    Runs slow LLM-backed requests in the background so the HTTP request can return
+    202 at once instead of holding a worker (and the client's proxy) for the whole
+    completion.
+
+    Jobs are functions returning (payload, status), like the synchronous views. At
+    most `workers + max_queue` jobs are outstanding; past that submit() raises
+    JobQueueFull. Finished jobs stay queryable for `results_ttl` seconds. Jobs live
+    in this process's memory, so clients poll the server that accepted them.
+    """
+
+    def __init__(self, workers=8, max_queue=64, results_ttl=3600, max_jobs=10000, window=1024):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self.jobs = TTLCache(max_jobs, results_ttl)
+        self._queue_waits = deque(maxlen=window)
+        self._run_times = deque(maxlen=window)
+        self.queued = 0
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, kind, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise JobQueueFull(f"{self.workers} workers busy and {self.max_queue} jobs already queued")
+
+        job = Job(kind)
+        self.jobs.put(job.id, job)
+        with self._lock:
+            self.queued += 1
+        try:
+            self._executor.submit(self._run, job, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            self._slots.release()
+            raise
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.started_at = time.time()
+        job.status = "running"
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            job.result, job.http_status = fn(*args, **kwargs)
+        except Exception as e:
+            print(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+            job.result, job.http_status = {"error": str(e)}, 500
+        finally:
+            job.status = "succeeded" if job.http_status is not None and job.http_status < 400 else "failed"
+            job.finished_at = time.time()
+            with self._lock:
+                self.running -= 1
+                if job.status == "succeeded":
+                    self.succeeded += 1
+                else:
+                    self.failed += 1
+                self._queue_waits.append(job.started_at - job.queued_at)
+                self._run_times.append(job.finished_at - job.started_at)
+            job.done.set()
+            self._slots.release()
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "maxQueue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "queueWaitMs": latency_summary(self._queue_waits),
+                "runMs": latency_summary(self._run_times),
+            }
+
+
+def async_requested(request, data=None):
+    """A caller asks for a background job with "async": true, ?async=1 or a Prefer: respond-async header."""
+    data = data or {}
+    return (
+        bool(data.get("async"))
+        or request.args.get("async") in ("1", "true")
+        or "respond-async" in request.headers.get("Prefer", "")
+    )
+
+
+def accepted(job):
+    """The 202 reply for a submitted job, pointing at its status URL."""
+    response = jsonify(job.to_dict())
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return response, 202
+
+
+def queue_full(error):
+    print(f"Job queue full: {str(error)}")
+    response = jsonify({"error": "Too many jobs queued, please retry shortly"})
+    response.headers["Retry-After"] = "2"
+    return response, 503
+
+
+# Longest a /jobs/<id>?wait= long-poll may block, in seconds
+MAX_JOB_WAIT = 60
+
+
+def register_job_routes(app, jobs):
+    """
+    Add GET /jobs (queue depth and timing) and GET /jobs/<id> to an app. Passing
+    ?wait=<seconds> to /jobs/<id> long-polls until the job finishes or the wait ends.
+    """
+
+    def job_status(job_id):
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": "Unknown or expired job"}), 404
+        try:
+            wait = min(float(request.args.get("wait", 0)), MAX_JOB_WAIT)
+        except ValueError:
+            return jsonify({"error": "wait must be a number of seconds"}), 400
+        if wait > 0:
+            job.done.wait(wait)
+        return jsonify(job.to_dict()), 200
+
+    def job_stats():
+        return jsonify(jobs.stats()), 200
+
+    app.add_url_rule("/jobs/<job_id>", "job_status", job_status, methods=["GET"])
+    app.add_url_rule("/jobs", "job_stats", job_stats, methods=["GET"])
@@ -0,0 +1,12 @@
+def latency_summary(samples):
+    """Mean, p50, p95 and max of a window of durations in seconds, reported in milliseconds."""
+    values = sorted(samples)
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    pick = lambda pct: values[min(len(values) - 1, int(pct / 100.0 * len(values)))]
+    return {
+        "mean": round(sum(values) / len(values) * 1000, 2),
+        "p50": round(pick(50) * 1000, 2),
+        "p95": round(pick(95) * 1000, 2),
+        "max": round(values[-1] * 1000, 2),
+    }
@@ -0,0 +1,69 @@
+import os
+from completionCache import CompletionCache
+from llmProviders import get_provider
+
+# OpenAI by default; LLM_PROVIDER=stub answers locally for offline runs and load tests
+provider = get_provider()
+
+# One completion cache per process, shared by the conversation, match and summary paths
+completion_cache = CompletionCache(
+    max_entries=int(os.getenv("LLM_CACHE_SIZE", 1024)),
+    ttl=int(os.getenv("LLM_CACHE_TTL", 3600)),
+    disk_path=os.getenv("LLM_CACHE_DISK") or None,
+    enabled=os.getenv("LLM_CACHE_ENABLED", "1") == "1",
+)
+
+
+def chat_completion(messages, model="gpt-4", max_tokens=150, temperature=0.7, use_cache=True,
+                    response_format=None, accept=None):
+    """
+    Return the text of a chat completion, serving identical requests from the cache.
+    Pass use_cache=False to always call the model (the fresh result is still cached).
+    response_format (e.g. {"type": "json_object"}) is only sent to models that support
+    it. A completion for which accept(content) is false is returned but not cached, so
+    a retry asks the model again instead of replaying it.
+    """
+    if response_format is not None and not provider.supports_response_format(model):
+        response_format = None
+    key = CompletionCache.key(model, messages, temperature, max_tokens, response_format)
+    if use_cache:
+        cached = completion_cache.get(key)
+        if cached is not None and (accept is None or accept(cached)):
+            return cached
+
+    params = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+    if response_format is not None:
+        params["response_format"] = response_format
+    response = provider.create(**params)
+    content = response["choices"][0]["message"]["content"]
+    if accept is None or accept(content):
+        completion_cache.put(key, content)
+    return content
+
+
+def stream_chat_completion(messages, model="gpt-4", max_tokens=150, temperature=0.7, use_cache=True):
+    """
+    Yield the completion text piece by piece as the model produces it.
+    A cache hit is yielded as a single piece; a completed stream is cached.
+    """
+    key = CompletionCache.key(model, messages, temperature, max_tokens)
+    if use_cache:
+        cached = completion_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    chunks = []
+    for chunk in provider.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True
+    ):
+        token = chunk["choices"][0].get("delta", {}).get("content")
+        if token:
+            chunks.append(token)
+            yield token
+
+    completion_cache.put(key, "".join(chunks))
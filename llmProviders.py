@@ -0,0 +1,187 @@
+import json
+import os
+import random
+import re
+import time
+import uuid
+import openai
+from personaRegistry import load_personas
+
+MOODS = ["Neutral", "Angry", "Surprised", "Happy", "Cool"]
+
+# Model families that support JSON mode; the original gpt-4 and gpt-3.5-turbo snapshots do not
+JSON_MODE_MODELS = ("gpt-4o", "gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo-1106", "gpt-3.5-turbo-0125")
+
+
+class OpenAIProvider:
+    """Sends chat completions to the OpenAI API."""
+
+    name = "openai"
+
+    def create(self, **params):
+        return openai.ChatCompletion.create(**params)
+
+    def supports_response_format(self, model):
+        """Whether the model accepts response_format={"type": "json_object"} (JSON mode)."""
+        return model.startswith(JSON_MODE_MODELS)
+
+
+class LatencyDistribution:
+    """
+    Samples delays (in seconds) from a spec such as:
+      fixed:0.8            always 0.8s
+      uniform:0.2,1.5      uniformly between 0.2s and 1.5s
+      normal:0.8,0.2       mean 0.8s, standard deviation 0.2s
+      lognormal:-0.3,0.5   exp(N(mu, sigma)), a long right tail like real LLM latency
+      exponential:0.8      mean 0.8s
+    """
+
+    def __init__(self, spec="fixed:0", rng=None):
+        self.spec = spec
+        self.rng = rng or random.Random()
+        kind, _, args = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.args = [float(a) for a in args.split(",") if a.strip()]
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution '{spec}'")
+
+    def sample(self):
+        if self.kind == "fixed":
+            value = self.args[0] if self.args else 0.0
+        elif self.kind == "uniform":
+            value = self.rng.uniform(self.args[0], self.args[1])
+        elif self.kind == "normal":
+            value = self.rng.gauss(self.args[0], self.args[1])
+        elif self.kind == "lognormal":
+            value = self.rng.lognormvariate(self.args[0], self.args[1])
+        else:
+            value = self.rng.expovariate(1.0 / self.args[0]) if self.args[0] > 0 else 0.0
+        return max(0.0, value)
+
+
+class StubProvider:
+    """
+    A local stand-in for the OpenAI API that needs no network. It answers in the
+    ChatCompletion shape with templated replies: mascot turns end in '--- <Mood>',
+    match prompts get match JSON and summary prompts get a short summary. Latency
+    and failures are injected from configurable distributions so load tests see
+    realistic timing.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency="fixed:0", token_delay=0.0, error_rate=0.0, seed=None):
+        self.rng = random.Random(seed)
+        self.latency = LatencyDistribution(latency, self.rng)
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+
+    def create(self, model="gpt-4", messages=None, max_tokens=None, temperature=None, stream=False, **kwargs):
+        time.sleep(self.latency.sample())
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise self.rng.choice([
+                openai.error.RateLimitError("Stub provider: simulated rate limit"),
+                openai.error.APIError("Stub provider: simulated server error"),
+                openai.error.Timeout("Stub provider: simulated timeout"),
+            ])
+
+        content = self.reply(messages or [])
+        if stream:
+            return self._stream(model, content)
+
+        prompt_tokens = sum(len(m["content"]) // 4 for m in messages or [])
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _stream(self, model, content):
+        chunk_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        for token in re.findall(r"\S+\s*", content):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+        yield {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+
+    def reply(self, messages):
+        text = "\n".join(m["content"] for m in messages)
+        if "Return a valid JSON" in text or "companyName:" in text:
+            return self._match_reply(text)
+        if "synthesizing venture capitalist feedback" in text:
+            return (
+                "The panel saw real promise in the idea but wants clearer numbers. "
+                "Strengths: a focused market and a credible plan. "
+                "Concerns: unit economics and competition. Overall a cautiously positive reception."
+            )
+        mood = self.rng.choice(MOODS)
+        return (
+            "Interesting pitch. Tell me how you will reach your first thousand customers "
+            f"and what it costs you to acquire each one. --- {mood}"
+        )
+
+    def supports_response_format(self, model):
+        # Match replies are always bare JSON, so the stub honours JSON mode for every model
+        return True
+
+    def _match_reply(self, text):
+        company = re.search(r"companyName:\s*(.+)", text)
+        email = re.search(r"companyEmail:\s*(.+)", text)
+        score = lambda: self.rng.randint(40, 95)
+        feedback = lambda: {
+            "score": score(),
+            "positives": ["Clear problem statement", "Credible go-to-market plan"],
+            "concerns": ["Unproven unit economics"],
+        }
+        return json.dumps({
+            "id": 1,
+            "companyName": company.group(1).strip() if company else "Stub Company",
+            "companyEmail": email.group(1).strip() if email else "founder@example.com",
+            "description": "Stub-generated match for local testing",
+            "matchScore": score(),
+            "stage": self.rng.choice(["Pre-seed", "Seed", "Series A"]),
+            "seeking": self.rng.choice(["$250K", "$500K", "$1M"]),
+            "industry": self.rng.choice(["AI/ML", "Fintech", "Education", "Food & Beverage"]),
+            "animalFeedback": dict(
+                {persona["feedbackKey"]: feedback() for persona in load_personas().values()},
+                summary=feedback(),
+            ),
+        }, indent=2)
+
+
+def get_provider():
+    """Build the provider selected by LLM_PROVIDER (openai by default, or stub)."""
+    name = os.getenv("LLM_PROVIDER", "openai").lower()
+    if name == "stub":
+        seed = os.getenv("LLM_STUB_SEED")
+        return StubProvider(
+            latency=os.getenv("LLM_STUB_LATENCY", "fixed:0"),
+            token_delay=float(os.getenv("LLM_STUB_TOKEN_DELAY", 0)),
+            error_rate=float(os.getenv("LLM_STUB_ERROR_RATE", 0)),
+            seed=int(seed) if seed else None,
+        )
+    if name == "openai":
+        return OpenAIProvider()
+    raise ValueError(f"Unknown LLM_PROVIDER '{name}'")
@@ -0,0 +1,676 @@
+from flask import Flask, Request, request, jsonify, Response, stream_with_context
+from flask_cors import CORS
+import openai
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+import base64
+import hashlib
+from io import BytesIO
+from personaRegistry import load_personas, parse_mood, MAX_TURNS
+from conversationStore import open_conversation_store, session_id_from, TurnConflictError
+from completionCache import TTLCache, CacheFull, bypass_requested
+from promptBuilder import build_conversation_messages
+from singleFlight import SingleFlight, idempotency_key_from
+from llmClient import chat_completion, stream_chat_completion, completion_cache
+from audioPipeline import transcribe, warm_up
+from speechPool import SpeechPool, SpeechQueueFull, SpeechTimeout
+from speechStream import SpeechStream
+
+# Load environment variables (e.g., OPENAI_API_KEY)
+load_dotenv(dotenv_path=os.path.join("instance", ".env"))
+load_dotenv(dotenv_path=os.path.join("", ".env"))
+openai.api_key = os.getenv("OPENAI_API_KEY")
+
+app = Flask(__name__)
+CORS(app)  # Enable CORS for all routes
+
+# Every mascot (Lion, Owl, Tusk, ...) is a persona served by this one process
+PERSONAS = load_personas()
+
+# Pitch, turn counters and history are keyed by session in a store shared by every worker
+store = open_conversation_store()
+
+# Duplicate turns (double-clicks, retries) that arrive while one is in flight share its completion
+turn_flights = SingleFlight(results_ttl=int(os.getenv("IDEMPOTENCY_TTL", 300)))
+
+# Panel rounds ask every mascot at once; each in-flight LLM call holds one of these threads
+panel_executor = ThreadPoolExecutor(max_workers=int(os.getenv("PANEL_WORKERS", 32)))
+
+
+# Audio decoding and recognition run in their own worker processes, away from the LLM request path
+speech_pool = SpeechPool(
+    workers=int(os.getenv("SPEECH_WORKERS", os.cpu_count() or 2)),
+    max_queue=int(os.getenv("SPEECH_MAX_QUEUE", 16)),
+    timeout=float(os.getenv("SPEECH_TIMEOUT", 60)),
+    initializer=warm_up,
+)
+
+
+def convert_audio_to_text(audio_data, input_format="webm"):
+    """Convert audio data to text on a speech worker."""
+    return speech_pool.run(transcribe, audio_data, input_format)
+
+
+# Retries and re-submits resend the same recording; its transcript is served from here by content hash
+transcript_cache = TTLCache(
+    max_entries=int(os.getenv("SPEECH_CACHE_SIZE", 512)),
+    ttl=int(os.getenv("SPEECH_CACHE_TTL", 3600)),
+)
+transcript_flights = SingleFlight()
+
+
+def cached_audio_to_text(audio_data, input_format="webm", use_cache=True):
+    """
+    convert_audio_to_text, memoized on a SHA-256 of the audio bytes. Identical uploads
+    in flight at the same time share one transcription; failed ones aren't cached.
+    """
+    key = f"{input_format}:{hashlib.sha256(audio_data).hexdigest()}"
+    if use_cache:
+        text = transcript_cache.get(key)
+        if text is not None:
+            return text
+    text = transcript_flights.do(key, convert_audio_to_text, audio_data, input_format)
+    if text:
+        transcript_cache.put(key, text)
+    return text
+
+
+# Uploads larger than this are rejected with 413 before they are decoded
+MAX_AUDIO_BYTES = int(os.getenv("MAX_AUDIO_BYTES", 10 * 1024 * 1024))
+# A multipart body may carry this much boundary and header overhead on top of the recording
+MAX_MULTIPART_BYTES = MAX_AUDIO_BYTES + 64 * 1024
+
+
+class AudioUploadRequest(Request):
+    """
+    Keeps multipart file parts in memory. Werkzeug spools parts of bodies over 500 KB
+    to a temporary file; recordings are read straight back into memory for ffmpeg, so
+    that would only add a disk round trip. Bodies of unknown or oversized length still
+    spool (and oversized ones are rejected before they are read).
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= MAX_MULTIPART_BYTES:
+            return BytesIO()
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+
+app.request_class = AudioUploadRequest
+
+# Upload content types ffmpeg gets an explicit demuxer for; anything else is probed
+AUDIO_FORMATS = {
+    "audio/webm": "webm",
+    "video/webm": "webm",
+    "audio/ogg": "ogg",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav",
+    "audio/mpeg": "mp3",
+}
+# The only demuxers a client can select; the format name ends up as ffmpeg's -f
+AUDIO_DEMUXERS = frozenset(AUDIO_FORMATS.values())
+
+
+def audio_format_from(mimetype, default=None):
+    """
+    The ffmpeg demuxer for a content type, else the default (e.g. a file extension) if
+    it is an allowed demuxer, else None so ffmpeg probes the input itself.
+    """
+    input_format = AUDIO_FORMATS.get((mimetype or "").split(";")[0].strip().lower())
+    if input_format:
+        return input_format
+    default = (default or "").lower()
+    return default if default in AUDIO_DEMUXERS else None
+
+
+def too_large():
+    print(f"Error: Audio upload larger than {MAX_AUDIO_BYTES} bytes")
+    return jsonify({"error": f"Audio upload exceeds {MAX_AUDIO_BYTES} bytes", "success": False}), 413
+
+
+def speech_unavailable(error):
+    """503 with Retry-After when the speech workers are saturated, 504 when a job timed out."""
+    if isinstance(error, SpeechTimeout):
+        print(f"Speech recognition timed out: {str(error)}")
+        return jsonify({"error": "Speech recognition timed out", "success": False}), 504
+    print(f"Speech queue full: {str(error)}")
+    response = jsonify({"error": "Speech recognition is busy, please retry shortly", "success": False})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
+def read_audio_upload():
+    """
+    Read the recording from a raw audio body (audio/webm, audio/ogg, ...), a multipart
+    "audio" file, or the original JSON body with a base64 data URL.
+    Returns (audio_bytes, input_format, None), or (None, None, (reply, status)) when the upload is rejected.
+    """
+    if request.mimetype == "multipart/form-data":
+        if request.content_length and request.content_length > MAX_MULTIPART_BYTES:
+            return None, None, too_large()
+        upload = request.files.get("audio") or next(iter(request.files.values()), None)
+        if upload is None:
+            print("Error: No audio file in multipart upload")
+            return None, None, (jsonify({"error": "No audio data provided", "success": False}), 400)
+        audio_bytes = upload.read(MAX_AUDIO_BYTES + 1)
+        extension = os.path.splitext(upload.filename or "")[1].lstrip(".").lower() or None
+        input_format = audio_format_from(upload.mimetype, extension)
+
+    elif request.mimetype.startswith("audio/") or request.mimetype in ("video/webm", "application/octet-stream"):
+        if request.content_length and request.content_length > MAX_AUDIO_BYTES:
+            return None, None, too_large()
+        # Read the body straight off the socket, without form or JSON parsing
+        audio_bytes = request.stream.read(MAX_AUDIO_BYTES + 1)
+        input_format = audio_format_from(request.mimetype)
+
+    else:
+        # Base64 inflates the recording by a third
+        if request.content_length and request.content_length > MAX_AUDIO_BYTES * 4 // 3 + 1024:
+            return None, None, too_large()
+        audio_data = request.json.get("audio")
+        if not audio_data:
+            print("Error: No audio data provided")
+            return None, None, (jsonify({"error": "No audio data provided", "success": False}), 400)
+
+        # Remove the data URL prefix if present
+        input_format = "webm"
+        if "base64," in audio_data:
+            prefix, audio_data = audio_data.split("base64,", 1)
+            input_format = audio_format_from(prefix.replace("data:", ""), "webm")
+
+        try:
+            # Decode base64 audio data
+            audio_bytes = base64.b64decode(audio_data)
+        except Exception as e:
+            print(f"Error decoding base64: {str(e)}")
+            return None, None, (jsonify({"error": "Invalid audio data format", "success": False}), 400)
+
+    if not audio_bytes:
+        print("Error: No audio data provided")
+        return None, None, (jsonify({"error": "No audio data provided", "success": False}), 400)
+    if len(audio_bytes) > MAX_AUDIO_BYTES:
+        return None, None, too_large()
+    return audio_bytes, input_format, None
+
+
+@app.route('/speech-to-text', methods=['POST'])
+@app.route('/speech-to-text-2', methods=['POST'])
+def speech_to_text():
+    """
+    Endpoint to convert speech audio data to text.
+    Accepts a raw audio body, a multipart "audio" file or JSON {"audio": "<base64 data URL>"}.
+    """
+    try:
+        print("\n=== New Speech-to-Text Request ===")
+        decoded_audio, input_format, error = read_audio_upload()
+        if error:
+            return error
+        print(f"Audio received ({input_format or 'unknown format'}), size:", len(decoded_audio))
+
+        # Convert audio to text
+        try:
+            text = cached_audio_to_text(decoded_audio, input_format, use_cache=not bypass_requested(request))
+        except (SpeechQueueFull, SpeechTimeout) as e:
+            return speech_unavailable(e)
+        if not text:
+            print("Error: No text generated from audio")
+            return jsonify({"error": "Could not transcribe audio. Please ensure the recording is clear.", "success": False}), 400
+
+        print(f"Transcribed text: {text}")
+        return jsonify({"text": text, "success": True})
+
+    except Exception as e:
+        print(f"Error in speech-to-text endpoint: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}", "success": False}), 500
+
+
+# Open streaming transcriptions; abandoned streams expire after SPEECH_STREAM_TTL seconds of inactivity.
+# A full table turns new streams away rather than evicting a live recording.
+speech_streams = TTLCache(
+    max_entries=int(os.getenv("SPEECH_MAX_STREAMS", 256)),
+    ttl=int(os.getenv("SPEECH_STREAM_TTL", 120)),
+)
+
+
+@app.route('/speech-stream', methods=['POST'])
+def start_speech_stream():
+    """
+    Opens a streaming transcription. The client POSTs raw audio chunks to
+    /speech-stream/<streamId> while recording and gets partial transcripts back;
+    the last chunk is sent with ?final=1 and returns the full transcript.
+    Optional body: {"format": "webm" | "audio/ogg" | ...}.
+    """
+    data = request.get_json(silent=True) or {}
+    requested = str(data.get("format") or "webm")
+    # The format becomes ffmpeg's demuxer, so only the allowlisted ones are accepted
+    input_format = audio_format_from(requested, requested)
+    if input_format is None:
+        return jsonify({
+            "error": f"Unsupported audio format '{requested}'; use one of {sorted(AUDIO_DEMUXERS)}",
+            "success": False,
+        }), 400
+    stream = SpeechStream(input_format)
+    try:
+        speech_streams.put(stream.id, stream, evict=False)
+    except CacheFull as e:
+        print(f"Speech stream table full: {str(e)}")
+        response = jsonify({"error": "Too many open speech streams, please retry shortly", "success": False})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+    print(f"Speech stream {stream.id} opened ({stream.input_format})")
+    return jsonify({"streamId": stream.id, "success": True}), 201
+
+
+@app.route('/speech-stream/<stream_id>', methods=['POST'])
+def speech_stream_chunk(stream_id):
+    """
+    Appends an audio chunk to a stream and returns the transcript so far. Phrases are
+    recognized as soon as a pause ends them, so the final chunk only has to wait for
+    the last phrase.
+    """
+    stream = speech_streams.get(stream_id)
+    if stream is None:
+        return jsonify({"error": "Unknown or expired speech stream", "success": False}), 404
+
+    final = request.args.get("final") in ("1", "true")
+    if request.content_length and stream.size + request.content_length > MAX_AUDIO_BYTES:
+        return too_large()
+    chunk = request.stream.read(MAX_AUDIO_BYTES + 1 - stream.size)
+    if stream.size + len(chunk) > MAX_AUDIO_BYTES:
+        return too_large()
+    # Re-storing refreshes the stream's expiry
+    speech_streams.put(stream_id, stream)
+
+    if not final:
+        stream.append(chunk)
+        # An update already running will pick this chunk up on the next one; don't queue behind it
+        if stream.busy.acquire(blocking=False):
+            try:
+                stream.advance(speech_pool)
+            except (SpeechQueueFull, SpeechTimeout) as e:
+                print(f"Skipping partial transcription of stream {stream_id}: {str(e)}")
+            finally:
+                stream.busy.release()
+        return jsonify({"partial": stream.text, "final": False, "success": True})
+
+    with stream.busy:
+        size_before = stream.size
+        stream.append(chunk)
+        try:
+            stream.advance(speech_pool, final=True)
+        except (SpeechQueueFull, SpeechTimeout) as e:
+            # The stream stays open and the final chunk is taken off again, so resending
+            # the same request as the 503 asks doesn't add its audio twice
+            stream.truncate(size_before)
+            return speech_unavailable(e)
+    speech_streams.pop(stream_id)
+
+    if not stream.text:
+        print("Error: No text generated from audio stream")
+        return jsonify({"error": "Could not transcribe audio. Please ensure the recording is clear.", "success": False}), 400
+    print(f"Transcribed stream {stream_id}: {stream.text}")
+    return jsonify({"text": stream.text, "final": True, "success": True})
+
+
+@app.route('/speech-stream/<stream_id>', methods=['DELETE'])
+def abort_speech_stream(stream_id):
+    """
+    Discards a stream the client gave up on.
+    """
+    speech_streams.pop(stream_id)
+    return jsonify({"success": True}), 200
+
+
+def finish_turn(session_id, mascot, turn, gpt_response):
+    """Parse the mood out of a completion, record it as the mascot's response and build the reply payload."""
+    message, emotion = parse_mood(gpt_response)
+
+    # Advances the turn counter only after processing
+    store.add_response(session_id, mascot, turn, f"{message} --- {emotion}")
+
+    return {
+        "message": message,
+        "mood": emotion,
+        "turn": turn,
+        "isComplete": turn >= MAX_TURNS,
+        "sessionId": session_id
+    }
+
+
+def wants_stream(data):
+    """Streaming is opt-in through "stream": true or an Accept: text/event-stream header."""
+    return bool(data.get("stream")) or "text/event-stream" in request.headers.get("Accept", "")
+
+
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def visible_message(text):
+    """
+    The part of a partial completion that is safe to show: everything before the
+    '--- Mood' marker, holding back trailing dashes that may be the start of it.
+    """
+    marker = text.find("---")
+    if marker != -1:
+        return text[:marker]
+    return text.rstrip("-")
+
+
+def stream_turn(session_id, mascot, turn, messages, use_cache=True, finish=None):
+    """
+    Yield 'token' events while the completion streams in, then a final 'mood' event
+    carrying the same payload as the non-streaming reply (or an 'error' event).
+    finish, from SingleFlight.lead, receives the (reply, status) for duplicates of this turn.
+    """
+    finish = finish or (lambda result=None, error=None: None)
+    chunks = []
+    emitted = 0
+    try:
+        for token in stream_chat_completion(messages, max_tokens=150, temperature=0.7, use_cache=use_cache):
+            chunks.append(token)
+
+            visible = visible_message("".join(chunks))
+            if len(visible) > emitted:
+                yield sse_event("token", {"token": visible[emitted:]})
+                emitted = len(visible)
+
+        reply = finish_turn(session_id, mascot, turn, "".join(chunks).strip())
+        finish((reply, 200))
+        yield sse_event("mood", reply)
+
+    except Exception as e:
+        print(f"Error in conversation stream: {str(e)}")
+        finish(error=e)
+        yield sse_event("error", {"error": str(e)})
+
+
+def replay_stream(reply):
+    """A finished turn's reply as the event stream a duplicate streaming request receives."""
+    yield sse_event("mood", reply)
+
+
+def prepare_turn(session_id, mascot, input_text):
+    """
+    Validate a turn and record the entrepreneur's input.
+    Returns (reply, status) when the turn is answered without the LLM (errors, static
+    greetings), otherwise (None, (turn, messages)) ready for a completion.
+    """
+    if mascot not in PERSONAS:
+        print(f"Error: Invalid mascot '{mascot}' specified. Available mascots: {list(PERSONAS.keys())}")
+        return {"error": f"Invalid mascot '{mascot}' specified."}, 400
+
+    persona = PERSONAS[mascot]
+
+    turn = store.get_turn(session_id, mascot)
+    if turn >= MAX_TURNS:
+        return {"error": "Conversation is already complete for this mascot."}, 400
+
+    if persona["opensWithPitch"]:
+        # If no input is provided and it's not the initial turn, do not proceed
+        if not input_text and turn > 0:
+            return {"error": "No input provided for this turn.", "success": False}, 400
+
+        # Record the business pitch only during the initial pitch stage
+        if turn == 0:
+            store.set_pitch(session_id, input_text)
+    else:
+        # Ensure the business pitch has been given
+        if store.get_pitch(session_id) is None:
+            return {"error": "Business pitch not found. Please start from the initial pitch page."}, 400
+
+        # Handle static initial response
+        if turn == 0 and not input_text:
+            return {
+                "message": persona["greeting"],
+                "mood": "Neutral",
+                "turn": 0,
+                "isComplete": False,
+                "sessionId": session_id
+            }, 200
+
+    # Save user input for non-initial responses
+    if turn > 0:
+        store.add_user_input(session_id, mascot, turn, input_text)
+
+    # Build conversation prompt
+    current_response_number = turn + 1
+    messages = build_conversation_messages(
+        persona,
+        current_response_number,
+        store.get_pitch(session_id),
+        store.history(session_id, mascot, current_response_number),
+    )
+    return None, (current_response_number, messages)
+
+
+def complete_turn(session_id, mascot, turn, messages, use_cache=True):
+    """Generate the mascot's response using OpenAI and record it."""
+    gpt_response = chat_completion(messages, max_tokens=150, temperature=0.7, use_cache=use_cache).strip()
+    return finish_turn(session_id, mascot, turn, gpt_response)
+
+
+def run_turn(session_id, mascot, input_text, use_cache=True):
+    """Run one blocking turn end to end; returns (reply, status)."""
+    try:
+        reply, prepared = prepare_turn(session_id, mascot, input_text)
+        if reply is not None:
+            return reply, prepared
+        turn, messages = prepared
+        return complete_turn(session_id, mascot, turn, messages, use_cache), 200
+    except TurnConflictError as e:
+        print(f"Conflict in conversation turn: {str(e)}")
+        return {"error": str(e)}, 409
+
+
+def turn_flight_key(session_id, mascot, idempotency_key=None):
+    """The single-flight key of a turn and whether its reply is remembered for retries."""
+    if idempotency_key:
+        # Scoped to the session and mascot, so another client reusing the key can't receive this reply
+        return f"idempotency:{session_id}:{mascot}:{idempotency_key}", True
+    return f"turn:{session_id}:{mascot}:{store.get_turn(session_id, mascot)}", False
+
+
+def coalesced_turn(session_id, mascot, input_text, use_cache=True, idempotency_key=None):
+    """
+    Run a turn through single-flight. Concurrent requests for the same session, mascot
+    and turn wait for one completion and get the same reply; with an idempotency key
+    the reply is also replayed to retries that arrive after it finished.
+    """
+    key, remember = turn_flight_key(session_id, mascot, idempotency_key)
+    return turn_flights.do(key, run_turn, session_id, mascot, input_text, use_cache, remember=remember)
+
+
+def coalesced_stream(session_id, mascot, input_text, use_cache=True, idempotency_key=None):
+    """
+    The streaming counterpart of coalesced_turn, sharing its keys: the first request
+    streams the completion as it arrives, while duplicates (concurrent, or retries with
+    the same idempotency key) wait for it and get the finished reply as a single 'mood'
+    event instead of calling the LLM and recording the turn again.
+    Returns a Response, or (reply, status) when the turn is answered without streaming.
+    """
+    key, remember = turn_flight_key(session_id, mascot, idempotency_key)
+    leader, outcome = turn_flights.lead(key, remember)
+    if not leader:
+        reply, status = outcome
+        if status != 200:
+            return reply, status
+        stream = replay_stream(reply)
+    else:
+        finish = outcome
+        try:
+            reply, prepared = prepare_turn(session_id, mascot, input_text)
+        except BaseException as e:
+            finish(error=e)
+            raise
+        if reply is not None:
+            finish((reply, prepared))
+            return reply, prepared
+        turn, messages = prepared
+        stream = stream_turn(session_id, mascot, turn, messages, use_cache, finish)
+
+    response = Response(
+        stream_with_context(stream),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    if leader:
+        # A client that disconnects before the stream ends must not leave duplicates waiting
+        response.call_on_close(lambda: finish(error=RuntimeError("Stream closed before the turn completed")))
+    return response
+
+
+@app.route('/conversation', methods=['POST'])
+@app.route('/<mascot>/conversation', methods=['POST'])
+def conversation(mascot=None):
+    """
+    Handles the conversation logic for all mascots.
+    The mascot comes from the URL (/lion/conversation) or the "mascot" field of the payload,
+    and the conversation from the X-Session-Id header or "sessionId" field.
+    Duplicate requests are coalesced; send an Idempotency-Key header to make retries safe.
+    Send "stream": true to receive the reply as Server-Sent Events; a duplicate or retried
+    streaming request gets the first request's finished reply as one 'mood' event.
+    """
+    try:
+        data = request.get_json()
+        print(f"Received JSON payload: {data}")
+
+        mascot = (mascot or data.get("mascot", "lion")).lower()
+        input_text = data.get("input", "").strip()
+        session_id = session_id_from(request, data)
+        use_cache = not bypass_requested(request, data)
+
+        idempotency_key = idempotency_key_from(request, data)
+
+        # Opt-in Server-Sent Events: tokens are forwarded as they arrive
+        if wants_stream(data):
+            result = coalesced_stream(session_id, mascot, input_text, use_cache, idempotency_key)
+            if isinstance(result, Response):
+                return result
+            reply, status = result
+            return jsonify(reply), status
+
+        reply, status = coalesced_turn(session_id, mascot, input_text, use_cache, idempotency_key)
+        return jsonify(reply), status
+
+    except TurnConflictError as e:
+        print(f"Conflict in conversation endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        print(f"Error in conversation endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+def run_panel_turn(session_id, mascot, input_text, use_cache=True, idempotency_key=None):
+    """One mascot's share of a panel round; returns (mascot, reply, status)."""
+    try:
+        reply, status = coalesced_turn(session_id, mascot, input_text, use_cache, idempotency_key)
+        return mascot, reply, status
+    except Exception as e:
+        print(f"Error in panel turn for {mascot}: {str(e)}")
+        return mascot, {"error": str(e)}, 500
+
+
+@app.route('/panel', methods=['POST'])
+def panel():
+    """
+    Sends one entrepreneur turn to every mascot (or the "mascots" listed) at once.
+    The mascots are asked concurrently, so a round takes as long as the slowest one.
+    Returns all replies keyed by mascot, or with "stream": true one 'mascot' event per
+    reply as soon as it completes, followed by a 'done' event.
+    """
+    try:
+        data = request.get_json()
+        print(f"Received panel payload: {data}")
+
+        input_text = data.get("input", "").strip()
+        session_id = session_id_from(request, data)
+        mascots = [m.lower() for m in data.get("mascots", PERSONAS.keys())]
+
+        unknown = [m for m in mascots if m not in PERSONAS]
+        if unknown:
+            return jsonify({"error": f"Invalid mascots specified: {unknown}"}), 400
+
+        # The first panel round carries the pitch for every mascot
+        if store.get_pitch(session_id) is None:
+            if not input_text:
+                return jsonify({"error": "No business pitch provided.", "success": False}), 400
+            store.set_pitch(session_id, input_text)
+
+        use_cache = not bypass_requested(request, data)
+        idempotency_key = idempotency_key_from(request, data)
+        futures = [
+            panel_executor.submit(run_panel_turn, session_id, m, input_text, use_cache, idempotency_key)
+            for m in mascots
+        ]
+
+        if wants_stream(data):
+            def generate():
+                for future in as_completed(futures):
+                    mascot, reply, status = future.result()
+                    yield sse_event("mascot", {"mascot": mascot, "status": status, **reply})
+                yield sse_event("done", {"sessionId": session_id})
+
+            return Response(
+                stream_with_context(generate()),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        responses = {}
+        errors = {}
+        for future in as_completed(futures):
+            mascot, reply, status = future.result()
+            if status == 200:
+                responses[mascot] = reply
+            else:
+                errors[mascot] = {"status": status, **reply}
+
+        return jsonify({
+            "responses": responses,
+            "errors": errors,
+            "sessionId": session_id
+        }), 200 if responses or not errors else 502
+
+    except Exception as e:
+        print(f"Error in panel endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """
+    Reports hit/miss counters of this process's LLM completion cache.
+    """
+    return jsonify(completion_cache.stats()), 200
+
+
+@app.route('/speech-stats', methods=['GET'])
+def speech_stats():
+    """
+    Reports speech worker load (queue depth, rejections, queue-wait/run latency) and transcript cache hits.
+    """
+    return jsonify({**speech_pool.stats(), "transcriptCache": transcript_cache.stats()}), 200
+
+
+@app.route('/session/reset', methods=['POST'])
+def reset_session():
+    """
+    Clears the pitch and every mascot's history for the caller's session so a new pitch can start.
+    """
+    try:
+        session_id = session_id_from(request, request.get_json(silent=True))
+        store.reset(session_id)
+        return jsonify({"message": "Session reset successfully!", "sessionId": session_id}), 200
+    except Exception as e:
+        print(f"Error in session reset endpoint: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+if __name__ == "__main__":
+    print("\n=== Starting Mascot Server ===")
+    print(f"Conversation Store: {store.path}")
+    print(f"Mascots: {list(PERSONAS.keys())}")
+    app.run(debug=True, port=5000)
@@ -0,0 +1,76 @@
+import math
+import re
+from collections import Counter
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9$%+.-]*[a-z0-9%]|[a-z0-9]")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or our that the their this to was we "
+    "were will with you your they them i my me us".split()
+)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def preference_text(value):
+    """Flatten investor preferences (nested dicts/lists of strings and numbers) into one text, keys included."""
+    if isinstance(value, dict):
+        return " ".join(f"{key} {preference_text(item)}" for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return " ".join(preference_text(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def tfidf_scores(documents, queries):
+    """
+    Cosine similarity between every document and every query under TF-IDF weights
+    fitted on the documents (sublinear tf, smoothed idf). Returns an array of shape
+    (len(documents), len(queries)).
+
+    Only the query terms can contribute to a dot product, so documents are laid out
+    as a dense matrix over the queries' vocabulary alone, with their full-vocabulary
+    norms computed up front; all pairs are then scored in one matrix product.
+    """
+    doc_counts = [Counter(tokenize(document)) for document in documents]
+    query_counts = [Counter(tokenize(query)) for query in queries]
+    if not doc_counts or not query_counts:
+        return np.zeros((len(doc_counts), len(query_counts)), dtype=np.float32)
+
+    document_frequency = Counter(term for counts in doc_counts for term in counts)
+    n_docs = len(doc_counts)
+    idf = lambda term: math.log((1 + n_docs) / (1 + document_frequency.get(term, 0))) + 1.0
+    weight = lambda count: 1.0 + math.log(count)
+
+    vocabulary = {term: column for column, term in enumerate(sorted({t for counts in query_counts for t in counts}))}
+    term_idf = np.array([idf(term) for term in vocabulary], dtype=np.float32)
+
+    doc_matrix = np.zeros((n_docs, len(vocabulary)), dtype=np.float32)
+    doc_norms = np.zeros(n_docs, dtype=np.float32)
+    for row, counts in enumerate(doc_counts):
+        doc_norms[row] = math.sqrt(sum((weight(count) * idf(term)) ** 2 for term, count in counts.items()))
+        for term, count in counts.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                doc_matrix[row, column] = weight(count)
+
+    query_matrix = np.zeros((len(query_counts), len(vocabulary)), dtype=np.float32)
+    for row, counts in enumerate(query_counts):
+        for term, count in counts.items():
+            query_matrix[row, vocabulary[term]] = weight(count)
+
+    doc_matrix *= term_idf
+    query_matrix *= term_idf
+    doc_matrix /= np.maximum(doc_norms, 1e-12)[:, None]
+    query_matrix /= np.maximum(np.linalg.norm(query_matrix, axis=1), 1e-12)[:, None]
+    return doc_matrix @ query_matrix.T
+
+
+def shortlist(scores, top_k):
+    """For each query column, the row indices of its top_k documents, best first."""
+    top_k = min(top_k, scores.shape[0])
+    # argpartition finds each column's top k in linear time; only those k are then sorted
+    top = np.argpartition(-scores, top_k - 1, axis=0)[:top_k]
+    ranked = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=0), axis=0), axis=0)
+    return [ranked[:, column].tolist() for column in range(scores.shape[1])]
@@ -0,0 +1,174 @@
+import json
+import re
+
+# The object the model is asked for; the first few fields can be filled in from the request
+REQUIRED_FIELDS = ("companyName", "companyEmail", "matchScore", "animalFeedback")
+TEXT_FIELDS = ("companyName", "companyEmail", "description", "stage", "seeking", "industry")
+FEEDBACK_LISTS = ("positives", "concerns")
+
+CODE_FENCE = re.compile(r"```[a-zA-Z]*\s*(.*?)```", re.DOTALL)
+SCORE_PATTERN = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*(?:%|/\s*100)?\s*$")
+
+
+class InvalidMatchResponse(ValueError):
+    """Raised when a match completion can't be turned into a match entry."""
+
+
+def _objects(text):
+    """Yield each top-level balanced {...} in text, skipping braces inside strings."""
+    start = text.find("{")
+    while start != -1:
+        depth, in_string, escaped = 0, False, False
+        for position in range(start, len(text)):
+            char = text[position]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    yield text[start:position + 1]
+                    break
+        else:
+            # Unbalanced from here (e.g. a stray brace in the prose); try the next one
+            position = start
+        start = text.find("{", position + 1)
+
+
+def _strip_trailing_commas(text):
+    """Drop commas directly before a closing } or ], leaving string contents alone."""
+    out, in_string, escaped = [], False, False
+    for position, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ",":
+            rest = text[position + 1:].lstrip()
+            if rest[:1] in ("}", "]"):
+                continue
+        out.append(char)
+    return "".join(out)
+
+
+def json_objects(text):
+    """
+    Yield the JSON objects in a completion that may wrap them in prose or a code
+    fence, or leave trailing commas behind: the whole text first, then each fenced
+    block, then every balanced {...} inside them. Raises InvalidMatchResponse if
+    there are none.
+    """
+    if not text or not text.strip():
+        raise InvalidMatchResponse("Empty response")
+
+    blocks = [text.strip()] + [block.strip() for block in CODE_FENCE.findall(text)]
+    candidates = blocks + [found for block in blocks for found in _objects(block) if found != block]
+
+    error, seen, found_any = None, set(), False
+    for candidate in candidates:
+        if candidate in seen:
+            continue
+        seen.add(candidate)
+        for attempt in (candidate, _strip_trailing_commas(candidate)):
+            try:
+                # strict=False lets raw newlines inside strings through
+                value = json.loads(attempt, strict=False)
+            except json.JSONDecodeError as e:
+                error = error or e
+                continue
+            if isinstance(value, dict):
+                found_any = True
+                yield value
+            break
+    if not found_any:
+        raise InvalidMatchResponse(f"No JSON object found: {error or 'expected an object'}")
+
+
+def _score(value, field):
+    """A 0-100 score given as a number or a string like "92", "92%" or "92/100"."""
+    if isinstance(value, bool):
+        raise InvalidMatchResponse(f"'{field}' must be a number")
+    if isinstance(value, str):
+        match = SCORE_PATTERN.match(value)
+        if not match:
+            raise InvalidMatchResponse(f"'{field}' must be a number, got {value!r}")
+        value = float(match.group(1))
+    if not isinstance(value, (int, float)):
+        raise InvalidMatchResponse(f"'{field}' must be a number")
+    if not 0 <= value <= 100:
+        raise InvalidMatchResponse(f"'{field}' must be between 0 and 100, got {value}")
+    return int(value) if float(value).is_integer() else value
+
+
+def _text_list(value, field):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise InvalidMatchResponse(f"'{field}' must be a list of strings")
+    return [item.strip() for item in value if item.strip()]
+
+
+def validate_match(entry, company_name=None, user_email=None):
+    """
+    Check a parsed match entry against the shape the match prompt asks for and
+    normalise it: scores become numbers, single strings become one-item lists, and a
+    missing company name or email is taken from the request. Raises InvalidMatchResponse.
+    """
+    if not isinstance(entry, dict):
+        raise InvalidMatchResponse("Match must be a JSON object")
+    entry = dict(entry)
+    if not entry.get("companyName") and company_name:
+        entry["companyName"] = company_name
+    if not entry.get("companyEmail") and user_email:
+        entry["companyEmail"] = user_email
+
+    missing = [field for field in REQUIRED_FIELDS if entry.get(field) in (None, "", {})]
+    if missing:
+        raise InvalidMatchResponse(f"Missing required fields: {', '.join(missing)}")
+
+    for field in TEXT_FIELDS:
+        if entry.get(field) is not None and not isinstance(entry[field], str):
+            if not isinstance(entry[field], (int, float)):
+                raise InvalidMatchResponse(f"'{field}' must be a string")
+            entry[field] = str(entry[field])
+    entry["matchScore"] = _score(entry["matchScore"], "matchScore")
+
+    feedback = entry["animalFeedback"]
+    if not isinstance(feedback, dict):
+        raise InvalidMatchResponse("'animalFeedback' must be an object")
+    entry["animalFeedback"] = {}
+    for reviewer, review in feedback.items():
+        if not isinstance(review, dict):
+            raise InvalidMatchResponse(f"'animalFeedback.{reviewer}' must be an object")
+        review = dict(review)
+        if "score" not in review:
+            raise InvalidMatchResponse(f"'animalFeedback.{reviewer}' has no score")
+        review["score"] = _score(review["score"], f"animalFeedback.{reviewer}.score")
+        for field in FEEDBACK_LISTS:
+            review[field] = _text_list(review.get(field, []), f"animalFeedback.{reviewer}.{field}")
+        entry["animalFeedback"][reviewer] = review
+    return entry
+
+
+def parse_match_response(gpt_response, company_name=None, user_email=None):
+    """Turn a match completion into a match entry: the first JSON object in it that validates."""
+    first_error = None
+    for candidate in json_objects(gpt_response):
+        try:
+            return validate_match(candidate, company_name, user_email)
+        except InvalidMatchResponse as e:
+            first_error = first_error or e
+    raise first_error
@@ -0,0 +1,280 @@
+import base64
+import json
+import os
+import time
+from sqliteUtil import SQLiteDatabase
+
+DB_PATH = os.path.join("backend", "db", "matches.db")
+LEGACY_JSON_PATH = os.path.join("backend", "matches_db.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_name TEXT,
+    company_email TEXT,
+    industry TEXT,
+    stage TEXT,
+    match_score REAL,
+    created REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_matches_company_name ON matches (company_name);
+CREATE INDEX IF NOT EXISTS idx_matches_industry ON matches (industry);
+CREATE INDEX IF NOT EXISTS idx_matches_stage ON matches (stage);
+CREATE INDEX IF NOT EXISTS idx_matches_match_score ON matches (match_score);
+CREATE INDEX IF NOT EXISTS idx_matches_created ON matches (created);
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    applied REAL NOT NULL
+);
+"""
+
+
+# Sort keys a client may ask for, mapped to indexed columns; id breaks ties so the order is total
+SORT_COLUMNS = {
+    "id": "id",
+    "matchScore": "match_score",
+    "companyName": "company_name",
+    "industry": "industry",
+    "stage": "stage",
+}
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a page cursor is malformed or was issued for a different sort order."""
+
+
+def encode_cursor(sort, descending, value, match_id):
+    payload = json.dumps([sort, descending, value, match_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort, descending):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_descending, value, match_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise InvalidCursorError("Malformed cursor")
+    if cursor_sort != sort or cursor_descending != descending or not isinstance(match_id, int):
+        raise InvalidCursorError("Cursor does not belong to this sort order")
+    return value, match_id
+
+
+def _score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MatchStore:
+    """
+    The match repository: one row per match in a local SQLite database in WAL mode.
+
+    The full match entry is kept as JSON in `data`; the fields the dashboard filters
+    and sorts on are copied into indexed columns. Ids come from AUTOINCREMENT inside
+    the insert transaction, so concurrent inserts from any process never collide and
+    inserts cost the same however many matches exist.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.db = SQLiteDatabase(path, "matches")
+        self._conn().conn.executescript(SCHEMA)
+
+    def _conn(self, write=True):
+        return self.db.transaction(write)
+
+    @staticmethod
+    def _row_values(entry):
+        return (
+            entry.get("companyName"),
+            entry.get("companyEmail"),
+            entry.get("industry"),
+            entry.get("stage"),
+            _score(entry.get("matchScore")),
+        )
+
+    @staticmethod
+    def _entry(row_id, data):
+        entry = json.loads(data)
+        entry["id"] = row_id
+        return entry
+
+    def add(self, entry):
+        """Insert a match and return it with its new id."""
+        entry = {key: value for key, value in entry.items() if key != "id"}
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "INSERT INTO matches (company_name, company_email, industry, stage, match_score, created, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._row_values(entry) + (time.time(), json.dumps(entry)),
+            )
+        return {"id": cursor.lastrowid, **entry}
+
+    def add_many(self, entries):
+        """Insert several matches in one transaction and return them with their new ids."""
+        stored = []
+        with self._conn() as conn:
+            now = time.time()
+            for entry in entries:
+                entry = {key: value for key, value in entry.items() if key != "id"}
+                cursor = conn.execute(
+                    "INSERT INTO matches (company_name, company_email, industry, stage, match_score, created, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    self._row_values(entry) + (now, json.dumps(entry)),
+                )
+                stored.append({"id": cursor.lastrowid, **entry})
+        return stored
+
+    def get(self, match_id):
+        with self._conn(write=False) as conn:
+            row = conn.execute("SELECT id, data FROM matches WHERE id = ?", (match_id,)).fetchone()
+        return self._entry(*row) if row else None
+
+    def all(self):
+        """Return every match, oldest first."""
+        with self._conn(write=False) as conn:
+            rows = conn.execute("SELECT id, data FROM matches ORDER BY id").fetchall()
+        return [self._entry(*row) for row in rows]
+
+    @staticmethod
+    def _filters(industries=None, stages=None, min_score=None, company=None):
+        """WHERE clauses and parameters for the dashboard filters."""
+        where, params = [], []
+        if industries:
+            where.append(f"industry IN ({', '.join('?' * len(industries))})")
+            params += industries
+        if stages:
+            where.append(f"stage IN ({', '.join('?' * len(stages))})")
+            params += stages
+        if min_score is not None:
+            where.append("match_score >= ?")
+            params.append(min_score)
+        if company:
+            escaped = company.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append("company_name LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        return where, params
+
+    def page(self, industries=None, stages=None, min_score=None, company=None,
+             sort="id", descending=False, cursor=None, limit=100):
+        """
+        One page of matches, filtered and ordered by an indexed column, using keyset
+        pagination: the cursor holds the last row's (sort value, id), so every page
+        is an index range scan however deep the client has paged.
+        Returns (entries, next_cursor); next_cursor is None on the last page.
+        """
+        column = SORT_COLUMNS[sort]
+        where, params = self._filters(industries, stages, min_score, company)
+
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort, descending)
+            # SQLite sorts NULLs first ascending and last descending
+            if column == "id":
+                where.append("id < ?" if descending else "id > ?")
+                params.append(last_id)
+            elif value is None and not descending:
+                where.append(f"(({column} IS NULL AND id > ?) OR {column} IS NOT NULL)")
+                params.append(last_id)
+            elif value is None:
+                where.append(f"({column} IS NULL AND id < ?)")
+                params.append(last_id)
+            elif not descending:
+                where.append(f"({column} > ? OR ({column} = ? AND id > ?))")
+                params += [value, value, last_id]
+            else:
+                where.append(f"({column} < ? OR ({column} = ? AND id < ?) OR {column} IS NULL)")
+                params += [value, value, last_id]
+
+        direction = "DESC" if descending else "ASC"
+        order = f"id {direction}" if column == "id" else f"{column} {direction}, id {direction}"
+        query = (
+            f"SELECT id, data, {column} FROM matches"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + f" ORDER BY {order} LIMIT ?"
+        )
+        with self._conn(write=False) as conn:
+            rows = conn.execute(query, params + [limit + 1]).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_id, _, last_value = rows[-1]
+            next_cursor = encode_cursor(sort, descending, last_value, last_id)
+        return [self._entry(row_id, data) for row_id, data, _ in rows], next_cursor
+
+    def iter_matches(self, industries=None, stages=None, min_score=None, company=None, since_id=0, batch_size=500):
+        """
+        Yield every matching entry with an id above since_id, in id order. Rows are read
+        in batches of batch_size, each in its own short read transaction, so memory
+        stays flat and writers are never held up however large the export is.
+        """
+        where, params = self._filters(industries, stages, min_score, company)
+        query = (
+            "SELECT id, data FROM matches WHERE " + " AND ".join(where + ["id > ?"]) + " ORDER BY id LIMIT ?"
+        )
+        last_id = since_id
+        while True:
+            with self._conn(write=False) as conn:
+                rows = conn.execute(query, params + [last_id, batch_size]).fetchall()
+            for row_id, data in rows:
+                yield self._entry(row_id, data)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def version(self):
+        """(highest id, time of the latest insert): changes whenever a match is added."""
+        with self._conn(write=False) as conn:
+            max_id, last_modified = conn.execute("SELECT MAX(id), MAX(created) FROM matches").fetchone()
+        return max_id or 0, last_modified or 0.0
+
+    def count(self):
+        with self._conn(write=False) as conn:
+            return conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def import_json(self, path=LEGACY_JSON_PATH):
+        """
+        One-shot migration of the old matches_db.json, keeping each entry's id. It is
+        recorded in the migrations table, so later startups skip it; the JSON file is
+        left in place untouched. Returns the number of matches imported.
+        """
+        name = f"import:{os.path.basename(path)}"
+        with self._conn() as conn:
+            if conn.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+                return 0
+            entries = []
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    entries = json.load(f)
+            # The old read-modify-write could hand out the same id twice; those entries get fresh
+            # ids, inserted after every kept id so they can't take one
+            seen, kept, renumbered = set(), [], []
+            for entry in entries:
+                match_id = entry.get("id")
+                if isinstance(match_id, int) and match_id not in seen:
+                    seen.add(match_id)
+                    kept.append((match_id, entry))
+                else:
+                    renumbered.append((None, entry))
+
+            now = time.time()
+            for match_id, entry in kept + renumbered:
+                data = {key: value for key, value in entry.items() if key != "id"}
+                conn.execute(
+                    "INSERT INTO matches (id, company_name, company_email, industry, stage, match_score, created, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (match_id,) + self._row_values(data) + (now, json.dumps(data)),
+                )
+            conn.execute("INSERT INTO migrations (name, applied) VALUES (?, ?)", (name, now))
+        return len(entries)
+
+
+def open_match_store():
+    """Open the match store configured by MATCH_DB and import the legacy matches_db.json on first use."""
+    matches = MatchStore(path=os.getenv("MATCH_DB", DB_PATH))
+    imported = matches.import_json(os.getenv("MATCH_JSON_PATH", LEGACY_JSON_PATH))
+    if imported:
+        print(f"Imported {imported} matches from matches_db.json into {matches.path}")
+    return matches
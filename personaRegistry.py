@@ -0,0 +1,46 @@
+import json
+import os
+
+# Personas are data, not servers: adding a mascot means adding an entry here
+PERSONAS_PATH = os.path.join("backend", "data", "mascot_moods.json")
+
+ALLOWED_EMOTIONS = ["Neutral", "Angry", "Surprised", "Happy", "Cool"]
+MAX_TURNS = 3
+
+
+def load_personas(path=PERSONAS_PATH):
+    """
+    Load the mascot personas from the registry file.
+    Returns a dict keyed by the lowercase mascot id (e.g. "lion").
+    """
+    with open(path, "r") as f:
+        raw = json.load(f)
+
+    personas = {}
+    for name, entry in raw.items():
+        mascot = name.lower()
+        personas[mascot] = {
+            "id": mascot,
+            "name": entry.get("name", name),
+            "displayName": entry.get("displayName", name),
+            "character": entry.get("character", ""),
+            # The mascot's key in a match's animalFeedback, which stored matches and the dashboard use
+            "feedbackKey": entry.get("feedbackKey", entry.get("displayName", name)),
+            "opensWithPitch": entry.get("opensWithPitch", False),
+            "greeting": entry.get("greeting"),
+            "prompt": entry.get("prompt", ""),
+            "turnInstruction": entry.get("turnInstruction", ""),
+            "finalTurnInstruction": entry.get("finalTurnInstruction", ""),
+        }
+    return personas
+
+
+def parse_mood(gpt_response):
+    """Split a '<message> --- <Mood>' completion into (message, mood)."""
+    if "---" in gpt_response:
+        message, emotion = gpt_response.rsplit("---", 1)
+        emotion = emotion.strip() if emotion.strip() in ALLOWED_EMOTIONS else "Neutral"
+    else:
+        message = gpt_response
+        emotion = "Neutral"
+    return message.strip(), emotion
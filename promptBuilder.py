@@ -0,0 +1,98 @@
+import os
+from personaRegistry import MAX_TURNS
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is in requirements.txt; without it, fall back to a conservative estimate
+    _encoding = None
+
+# The fallback errs high so prompts stay within budget: English averages ~4 characters per
+# token, but code and punctuation run denser and non-ASCII text can take a token per character
+FALLBACK_ASCII_CHARS_PER_TOKEN = 3
+
+# Upper bound for the whole conversation prompt (system prefix + pitch + history + instruction)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 2000))
+
+# Chat formatting overhead the API adds around every message
+TOKENS_PER_MESSAGE = 4
+TRUNCATION_MARKER = " [...]"
+
+
+def count_tokens(text):
+    """Count tokens locally with tiktoken when available, otherwise estimate them conservatively."""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return -(-ascii_chars // FALLBACK_ASCII_CHARS_PER_TOKEN) + len(text) - ascii_chars
+
+
+def count_message_tokens(messages):
+    return sum(count_tokens(message["content"]) + TOKENS_PER_MESSAGE for message in messages)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text down to roughly max_tokens, keeping its beginning."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        return _encoding.decode(_encoding.encode(text)[:max_tokens]) + TRUNCATION_MARKER
+    # Keep the longest prefix the fallback estimate counts as at most max_tokens
+    budget = max_tokens * FALLBACK_ASCII_CHARS_PER_TOKEN
+    for end, char in enumerate(text):
+        budget -= 1 if char < "\x80" else FALLBACK_ASCII_CHARS_PER_TOKEN
+        if budget < 0:
+            return text[:end] + TRUNCATION_MARKER
+    return text
+
+
+def turn_instruction(persona, current_turn):
+    final_turn = current_turn == MAX_TURNS
+    return (
+        f"Current turn: {current_turn}/{MAX_TURNS}. "
+        + (persona["finalTurnInstruction"] if final_turn else persona["turnInstruction"])
+    )
+
+
+def build_conversation_messages(persona, current_turn, business_pitch, history, budget=PROMPT_TOKEN_BUDGET):
+    """
+    Build the chat messages for a mascot turn within a token budget.
+
+    The persona is a fixed system message and the pitch and earlier exchanges follow
+    as user/assistant messages, so every turn of a conversation extends the previous
+    turn's prompt instead of rewriting it. Only the closing turn instruction changes.
+    When the prompt is over budget the latest exchange (the entrepreneur's current
+    answer) is always kept, the pitch is truncated to fit beside it, and older
+    exchanges fill what is left, oldest dropped first.
+    """
+    system = {"role": "system", "content": persona["prompt"]}
+    instruction = {"role": "system", "content": turn_instruction(persona, current_turn)}
+
+    exchanges = []
+    for _, mascot_response, user_input in history:
+        exchanges.append([
+            {"role": "assistant", "content": mascot_response},
+            {"role": "user", "content": f"Entrepreneur: {user_input}"},
+        ])
+    latest = exchanges.pop() if exchanges else []
+
+    pitch_message = {"role": "user", "content": f"Business Pitch: {business_pitch}"}
+    reserved_tokens = count_message_tokens([system, instruction] + latest)
+
+    # Shorten the pitch so it fits beside the latest exchange
+    remaining = budget - reserved_tokens - TOKENS_PER_MESSAGE
+    if count_tokens(pitch_message["content"]) > remaining:
+        pitch_message = {
+            "role": "user",
+            "content": truncate_to_tokens(pitch_message["content"], remaining - count_tokens(TRUNCATION_MARKER)),
+        }
+
+    # Then drop the oldest earlier exchanges until everything fits
+    used_tokens = reserved_tokens + count_message_tokens([pitch_message])
+    while exchanges and used_tokens + count_message_tokens(sum(exchanges, [])) > budget:
+        exchanges.pop(0)
+
+    history_messages = sum(exchanges, []) + latest
+    return [system, pitch_message] + history_messages + [instruction]
@@ -0,0 +1,101 @@
+import threading
+from completionCache import TTLCache
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished = False
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the function,
+    duplicates arriving while it is in flight wait for it and get the same result
+    (or the same exception).
+
+    With remember=True the result is also kept for `results_ttl` seconds, so a retry
+    carrying the same idempotency key after the call finished gets the stored result
+    instead of running it again.
+
+    Coalescing is per process; duplicates that land on different workers are caught
+    by the conversation store's turn check instead.
+    """
+
+    def __init__(self, results_ttl=300, max_results=1024):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.results = TTLCache(max_results, results_ttl)
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, remember=False, **kwargs):
+        leader, outcome = self.lead(key, remember)
+        if not leader:
+            return outcome
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            outcome(error=e)
+            raise
+        outcome(result)
+        return result
+
+    def lead(self, key, remember=False):
+        """
+        The building block of do() for callers that produce the result themselves, such
+        as a streamed reply. Returns (False, result) for a duplicate, with the stored or
+        awaited result (or raises the leader's exception). Returns (True, finish) for the
+        leader, which must call finish(result) or finish(error=e) exactly once; later
+        calls are ignored.
+        """
+        if remember:
+            stored = self.results.get(key)
+            if stored is not None:
+                with self._lock:
+                    self.coalesced += 1
+                return False, stored
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return False, call.result
+
+        def finish(result=None, error=None):
+            with self._lock:
+                if call.finished:
+                    return
+                call.finished = True
+            if error is None:
+                call.result = result
+                if remember:
+                    self.results.put(key, result)
+            else:
+                call.error = error
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return True, finish
+
+    def stats(self):
+        with self._lock:
+            return {"inFlight": len(self._calls), "executed": self.executed, "coalesced": self.coalesced}
+
+
+def idempotency_key_from(request, data=None):
+    """Read a client-supplied idempotency key from the Idempotency-Key header or "idempotencyKey" field."""
+    data = data or {}
+    return request.headers.get("Idempotency-Key") or data.get("idempotencyKey")
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from latencyStats import latency_summary
+
+
+class SpeechQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is at its limit."""
+
+
+class SpeechTimeout(Exception):
+    """Raised when a job doesn't finish within the pool's timeout."""
+
+
+def _timed_call(submitted_at, fn, *args):
+    started = time.time()
+    result = fn(*args)
+    return result, started - submitted_at, time.time() - started
+
+
+def _ready():
+    return True
+
+
+class SpeechPool:
+    """
+    Runs audio decoding and recognition in worker processes, so CPU-heavy ffmpeg work
+    stays off the request threads and spreads across cores.
+
+    At most `workers + max_queue` jobs are admitted at once; past that run() raises
+    SpeechQueueFull so the endpoint sheds load instead of piling up requests. Time
+    spent waiting for a worker and time spent running are tracked separately.
+    """
+
+    def __init__(self, workers=2, max_queue=16, timeout=60, initializer=None, window=1024):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.initializer = initializer
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._queue_waits = deque(maxlen=window)
+        self._run_times = deque(maxlen=window)
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def start(self):
+        """Spawn and warm every worker now rather than on the first upload."""
+        executor = self._pool()
+        for future in [executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def _pool(self):
+        # Created on first use so the workers fork from the serving process, not from Run.py's parent
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer)
+            return self._executor
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def run(self, fn, *args):
+        """Run fn(*args) on a worker and wait for its result."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise SpeechQueueFull(f"{self.workers} workers busy and {self.max_queue} jobs already queued")
+
+        with self._lock:
+            self.in_flight += 1
+            self.submitted += 1
+
+        try:
+            future = self._pool().submit(_timed_call, time.time(), fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the job really finishes, even if the caller gave up waiting
+        future.add_done_callback(self._release)
+
+        try:
+            result, queue_wait, run_time = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise SpeechTimeout(f"Speech job did not finish within {self.timeout}s")
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool on the next call
+            with self._lock:
+                self.failed += 1
+                self._executor = None
+            raise
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+            self._queue_waits.append(queue_wait)
+            self._run_times.append(run_time)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "maxQueue": self.max_queue,
+                "inFlight": self.in_flight,
+                "queued": max(0, self.in_flight - self.workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timedOut": self.timed_out,
+                "queueWaitMs": latency_summary(self._queue_waits),
+                "runMs": latency_summary(self._run_times),
+            }
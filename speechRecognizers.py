@@ -0,0 +1,111 @@
+import json
+import os
+import time
+import speech_recognition as sr
+
+# Every backend takes mono 16-bit PCM at this rate (see audioPipeline)
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+SPEECH_STUB_TEXT = "We sell fresh bread to local cafes and grow through subscriptions."
+
+
+class GoogleRecognizer:
+    """Google's free Web Speech API, through speech_recognition. Needs network access."""
+
+    name = "google"
+
+    def __init__(self, language="en-US"):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, pcm):
+        return self.recognizer.recognize_google(sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH), language=self.language)
+
+
+class SphinxRecognizer:
+    """
+    CMU PocketSphinx, fully offline, using the en-US model bundled with speech_recognition.
+    The decoder is built once and reused, instead of once per call as recognize_sphinx does.
+    Requires the optional pocketsphinx package.
+    """
+
+    name = "sphinx"
+
+    def __init__(self):
+        from pocketsphinx import pocketsphinx
+
+        model_dir = os.path.join(os.path.dirname(os.path.realpath(sr.__file__)), "pocketsphinx-data", "en-US")
+        config = pocketsphinx.Decoder.default_config()
+        config.set_string("-hmm", os.path.join(model_dir, "acoustic-model"))
+        config.set_string("-lm", os.path.join(model_dir, "language-model.lm.bin"))
+        config.set_string("-dict", os.path.join(model_dir, "pronounciation-dictionary.dict"))
+        config.set_string("-logfn", os.devnull)
+        self.decoder = pocketsphinx.Decoder(config)
+
+    def recognize(self, pcm):
+        self.decoder.start_utt()
+        self.decoder.process_raw(pcm, False, True)
+        self.decoder.end_utt()
+        hypothesis = self.decoder.hyp()
+        if hypothesis is None or not hypothesis.hypstr:
+            raise sr.UnknownValueError()
+        return hypothesis.hypstr
+
+
+class VoskRecognizer:
+    """
+    Kaldi-based Vosk, fully offline. The model directory (one of the packages from
+    https://alphacephei.com/vosk/models) is loaded once per worker.
+    Requires the optional vosk package.
+    """
+
+    name = "vosk"
+
+    def __init__(self, model_path):
+        from vosk import Model, SetLogLevel
+
+        SetLogLevel(-1)
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Vosk model not found at '{model_path}' (set VOSK_MODEL_PATH)")
+        self.model = Model(model_path)
+
+    def recognize(self, pcm):
+        from vosk import KaldiRecognizer
+
+        recognizer = KaldiRecognizer(self.model, SAMPLE_RATE)
+        recognizer.AcceptWaveform(pcm)
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class StubRecognizer:
+    """Returns a canned transcript after a fixed delay, for offline runs and load tests."""
+
+    name = "stub"
+
+    def __init__(self, latency=0.0, text=SPEECH_STUB_TEXT):
+        self.latency = latency
+        self.text = text
+
+    def recognize(self, pcm):
+        time.sleep(self.latency)
+        if not pcm:
+            raise sr.UnknownValueError()
+        return self.text
+
+
+def get_recognizer(name=None):
+    """Build the backend selected by SPEECH_RECOGNIZER: google (default), sphinx, vosk or stub."""
+    name = (name or os.getenv("SPEECH_RECOGNIZER", "google")).lower()
+    if name == "google":
+        return GoogleRecognizer(language=os.getenv("SPEECH_LANGUAGE", "en-US"))
+    if name == "sphinx":
+        return SphinxRecognizer()
+    if name == "vosk":
+        return VoskRecognizer(os.getenv("VOSK_MODEL_PATH", os.path.join("backend", "models", "vosk")))
+    if name == "stub":
+        return StubRecognizer(latency=float(os.getenv("SPEECH_STUB_LATENCY", 0)))
+    raise ValueError(f"Unknown SPEECH_RECOGNIZER '{name}'")
@@ -0,0 +1,48 @@
+import threading
+import uuid
+from audioPipeline import transcribe_new_speech
+
+
+class SpeechStream:
+    """
+    A recording that arrives in chunks while the user is still speaking.
+
+    Each update decodes the audio received so far and recognizes only the phrases
+    that a pause has closed since the last update, so once the final chunk lands
+    only the last phrase is left to recognize.
+    """
+
+    def __init__(self, input_format="webm"):
+        self.id = uuid.uuid4().hex
+        self.input_format = input_format
+        self.audio = bytearray()
+        self.offset = 0
+        self.phrases = []
+        self._append_lock = threading.Lock()
+        # Held while a worker recognizes this stream, so updates run one at a time and in order
+        self.busy = threading.Lock()
+
+    def append(self, chunk):
+        with self._append_lock:
+            self.audio.extend(chunk)
+
+    def truncate(self, size):
+        """Drop everything appended after the first `size` bytes."""
+        with self._append_lock:
+            del self.audio[size:]
+
+    @property
+    def size(self):
+        return len(self.audio)
+
+    @property
+    def text(self):
+        return " ".join(self.phrases)
+
+    def advance(self, pool, final=False):
+        """Recognize new phrases on a speech worker. Call with `busy` held."""
+        with self._append_lock:
+            audio = bytes(self.audio)
+        self.offset, text = pool.run(transcribe_new_speech, audio, self.input_format, self.offset, final)
+        if text:
+            self.phrases.append(text)
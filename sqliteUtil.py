@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import threading
+
+
+class Transaction:
+    """
+    Wraps a connection in BEGIN ... COMMIT; writers use BEGIN IMMEDIATE so they serialize across processes.
+    An optional lock is held for the whole transaction (used by in-memory shared-cache databases).
+    """
+
+    def __init__(self, conn, write, lock=None):
+        self.conn = conn
+        self.write = write
+        self.lock = lock
+
+    def __enter__(self):
+        if self.lock is not None:
+            self.lock.acquire()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE" if self.write else "BEGIN")
+        except BaseException:
+            if self.lock is not None:
+                self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            if self.lock is not None:
+                self.lock.release()
+        return False
+
+
+class SQLiteDatabase:
+    """
+    A local SQLite database in WAL mode with one connection per thread, shared by the
+    stores. Pass ":memory:" for a process-local database named `name`.
+    """
+
+    def __init__(self, path, name):
+        self.path = path
+        self._local = threading.local()
+        self._memory_lock = None
+
+        if path == ":memory:":
+            # Shared-cache URI so every thread of this process sees the same database. Shared-cache
+            # table locks fail at once with SQLITE_LOCKED instead of honouring busy_timeout, so
+            # transactions take turns on a process-level lock instead
+            self._uri = f"file:{name}?mode=memory&cache=shared"
+            self._memory_lock = threading.RLock()
+            self._keepalive = self._connect()
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._uri = f"file:{path}"
+
+    def _connect(self):
+        conn = sqlite3.connect(self._uri, uri=True, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=10000")
+        return conn
+
+    def transaction(self, write=True):
+        """This thread's connection wrapped in a transaction, for use as a context manager."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return Transaction(conn, write, self._memory_lock)
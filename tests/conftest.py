@@ -0,0 +1,18 @@
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The servers read backend/ paths relative to the working directory and configure
+# themselves from the environment at import time: run them against the stub LLM and
+# speech recognizer, with in-memory stores so the repo's data is never touched
+os.chdir(REPO_DIR)
+sys.path.insert(0, REPO_DIR)
+os.environ.update({
+    "LLM_PROVIDER": "stub",
+    "LLM_CACHE_ENABLED": "0",
+    "SPEECH_RECOGNIZER": "stub",
+    "CONVERSATION_DB": ":memory:",
+    "MATCH_DB": ":memory:",
+    "MATCH_JSON_PATH": os.path.join(REPO_DIR, "tests", "no-legacy-matches.json"),
+})
@@ -0,0 +1,74 @@
+import json
+import mascotServer
+import Server4
+
+
+def test_same_idempotency_key_in_two_sessions_stays_separate():
+    client = mascotServer.app.test_client()
+    headers = {"Idempotency-Key": "1"}
+    mascotServer.store.set_pitch("idem-bob", "Bob's fintech pitch")
+
+    alice = client.post("/lion/conversation", json={"sessionId": "idem-alice", "input": "Alice's bakery pitch"},
+                        headers=headers)
+    bob = client.post("/tusk/conversation", json={"sessionId": "idem-bob", "input": "We charge 1% per payment."},
+                      headers=headers)
+
+    assert alice.status_code == 200 and bob.status_code == 200
+    assert alice.json["sessionId"] == "idem-alice"
+    assert bob.json["sessionId"] == "idem-bob"
+    # Bob's turn really ran instead of being answered with Alice's reply
+    assert mascotServer.store.get_turn("idem-bob", "tusk") == 1
+    assert mascotServer.store.get_turn("idem-bob", "lion") == 0
+
+
+def test_retry_with_same_key_in_same_session_is_replayed():
+    client = mascotServer.app.test_client()
+    headers = {"Idempotency-Key": "retry-1"}
+    payload = {"sessionId": "idem-retry", "input": "A pitch"}
+
+    first = client.post("/lion/conversation", json=payload, headers=headers)
+    second = client.post("/lion/conversation", json=payload, headers=headers)
+
+    assert first.status_code == 200
+    assert second.json == first.json
+    assert mascotServer.store.get_turn("idem-retry", "lion") == 1
+
+
+def test_process_match_key_is_scoped_to_session(tmp_path, monkeypatch):
+    preferences = tmp_path / "investor_preferences.json"
+    preferences.write_text(json.dumps({"industries": ["Fintech"]}))
+    monkeypatch.setattr(Server4, "INVESTOR_PREFERENCES_PATH", str(preferences))
+    client = Server4.app.test_client()
+    headers = {"Idempotency-Key": "1"}
+    Server4.store.set_pitch("idem-match-a", "A bakery")
+    Server4.store.set_pitch("idem-match-b", "A payments app")
+
+    first = client.post("/processMatch", json={"sessionId": "idem-match-a", "companyName": "Acme"}, headers=headers)
+    second = client.post("/processMatch", json={"sessionId": "idem-match-b", "companyName": "Acme"}, headers=headers)
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json["entry"]["id"] != second.json["entry"]["id"]
+
+
+def mood_event(body):
+    events = [block for block in body.decode("utf-8").split("\n\n") if block.startswith("event: mood")]
+    assert len(events) == 1
+    return json.loads(events[0].split("data: ", 1)[1])
+
+
+def test_streamed_retry_with_same_key_replays_the_turn():
+    client = mascotServer.app.test_client()
+    headers = {"Idempotency-Key": "stream-1"}
+    payload = {"sessionId": "idem-stream", "input": "A streamed pitch", "stream": True}
+
+    first = client.post("/lion/conversation", json=payload, headers=headers)
+    first_reply = mood_event(first.data)
+    second = client.post("/lion/conversation", json=payload, headers=headers)
+
+    assert second.status_code == 200
+    assert mood_event(second.data) == first_reply
+    assert b"event: error" not in second.data
+    assert mascotServer.store.get_turn("idem-stream", "lion") == 1
+    # A non-streaming retry of the same turn is answered from the same reply
+    third = client.post("/lion/conversation", json=dict(payload, stream=False), headers=headers)
+    assert third.json == first_reply
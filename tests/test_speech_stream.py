@@ -0,0 +1,32 @@
+import mascotServer
+from speechPool import SpeechQueueFull
+
+
+class FlakyPool:
+    """Fails the first final recognition with a full queue, then reports how much audio it was given."""
+
+    def __init__(self):
+        self.failed = False
+
+    def run(self, fn, audio, input_format, offset, final):
+        if final and not self.failed:
+            self.failed = True
+            raise SpeechQueueFull("busy")
+        return len(audio), f"{len(audio)} bytes" if final else None
+
+
+def test_final_chunk_retried_after_503_is_not_added_twice(monkeypatch):
+    monkeypatch.setattr(mascotServer, "speech_pool", FlakyPool())
+    client = mascotServer.app.test_client()
+    stream_id = client.post("/speech-stream", json={"format": "webm"}).json["streamId"]
+    headers = {"Content-Type": "audio/webm"}
+
+    assert client.post(f"/speech-stream/{stream_id}", data=b"a" * 100, headers=headers).status_code == 200
+
+    busy = client.post(f"/speech-stream/{stream_id}?final=1", data=b"b" * 50, headers=headers)
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"]
+
+    retry = client.post(f"/speech-stream/{stream_id}?final=1", data=b"b" * 50, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json["text"] == "150 bytes"